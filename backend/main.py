@@ -2,7 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from backend.utils.logger import logger
-from backend.routes import search
+from backend.routes import search, businesses
 from backend.models.db_manager import db_manager
 from backend.utils.constants import ALLOWED_ORIGINS
 
@@ -31,6 +31,7 @@ app.add_middleware(
 
 # Include routes
 app.include_router(search.router, prefix="/api")
+app.include_router(businesses.router, prefix="/api")
 
 @app.get("/")
 def root():
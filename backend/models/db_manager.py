@@ -1,8 +1,40 @@
-from peewee import SqliteDatabase, IntegrityError
+import operator
+from datetime import datetime, timezone
+from functools import reduce
+from zoneinfo import ZoneInfo
+
+from peewee import SqliteDatabase, IntegrityError, SQL, fn, CharField, JOIN
+from playhouse.migrate import SqliteMigrator, migrate
 from backend.models.database import database_proxy
 from backend.models.models import Business, Location, Category, BusinessCategory, BusinessHours, Attribute, SearchTerm, \
-    BusinessSearch
+    BusinessSearch, BusinessOpenInterval, LocationAlias
 from backend.utils.logger import logger
+from backend.utils.normalization import DEFAULT_LOCATION_ALIASES, RETIRED_LOCATION_ALIASES, normalize_text, \
+    normalize_location, build_canonical_key, canonical_search_key
+from backend.utils.utils import hours_to_week_intervals, minute_of_week, MINUTES_PER_DAY, OPEN_NOW, \
+    US_STATE_TIMEZONES
+
+# All tables, parents before children
+MODELS = [
+    LocationAlias,
+    SearchTerm,
+    Business,
+    Location,
+    Category,
+    BusinessCategory,
+    BusinessHours,
+    BusinessOpenInterval,
+    Attribute,
+    BusinessSearch,
+]
+
+# Sort keys accepted by the local business queries
+BUSINESS_SORT_FIELDS = {
+    "rating": Business.rating,
+    "review_count": Business.review_count,
+    "distance": Business.distance,
+    "name": Business.name,
+}
 
 
 class DBManager:
@@ -16,27 +48,37 @@ class DBManager:
         """Initializes and connects the database."""
         logger.info("Initializing database...")
 
-        self.db = SqliteDatabase(self.db_path)
+        # WAL lets readers and the writer proceed concurrently instead of failing with "database is locked"
+        self.db = SqliteDatabase(self.db_path, pragmas={"journal_mode": "wal"})
         database_proxy.initialize(self.db)
 
         try:
             self.db.connect()
             logger.info("Database connected successfully.")
 
-            self.db.create_tables(
-                [
-                    SearchTerm,
-                    Business,
-                    Location,
-                    Category,
-                    BusinessCategory,
-                    BusinessHours,
-                    Attribute,
-                    BusinessSearch,
-                ],
-                safe=True
-            )
+            self.migrate_search_terms()
+            self.db.create_tables(MODELS, safe=True)
+            # Single-column indexes superseded by the (city, business) and (category, business) indexes
+            self.db.execute_sql('DROP INDEX IF EXISTS "location_city"')
+            self.db.execute_sql('DROP INDEX IF EXISTS "businesscategory_category_id"')
             logger.info("Database tables ensured.")
+
+            LocationAlias.insert_many(
+                [{"alias": alias, "canonical": canonical} for alias, canonical in DEFAULT_LOCATION_ALIASES.items()]
+            ).on_conflict_ignore().execute()
+            self.retire_location_aliases()
+
+            # Re-key searches stored before canonical keys existed or under older rules, merging duplicates
+            if self.canonical_keys_outdated():
+                self.canonicalize_search_terms()
+
+            # Backfill the open-hours index for databases created before it existed
+            if not BusinessOpenInterval.select().exists() and BusinessHours.select().exists():
+                self.rebuild_open_intervals()
+
+            # Sampled statistics (milliseconds even at 1M rows) let the planner pick the covering indexes
+            self.db.execute_sql("PRAGMA analysis_limit = 1000")
+            self.db.execute_sql("ANALYZE")
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
 
@@ -127,7 +169,8 @@ class DBManager:
                             end_time=business_hour["end_time"],
                             is_overnight=business_hour["is_overnight"]
                         )
-                    except IntegrityError as e:
+                        self.insert_open_intervals(business, business_hour)
+                    except (IntegrityError, ValueError, TypeError) as e:
                         logger.error(f"BusinessHours insert failed: {e}")
 
                 # Insert attributes
@@ -152,17 +195,112 @@ class DBManager:
         except Exception as e:
             logger.error(f"Error inserting business: {e}")
 
+    @staticmethod
+    def insert_open_intervals(business, business_hour: dict):
+        """Stores the minute-of-week intervals for a single opening-hours entry."""
+        intervals = hours_to_week_intervals(
+            int(business_hour["day"]),
+            business_hour["start_time"],
+            business_hour["end_time"],
+            business_hour.get("is_overnight", False)
+        )
+        BusinessOpenInterval.insert_many(
+            [{"business": business, "start_minute": start, "end_minute": end} for start, end in intervals]
+        ).execute()
+
+    def rebuild_open_intervals(self):
+        """Regenerates the open-hours index from all stored BusinessHours."""
+        logger.info("Rebuilding open-hours index...")
+        try:
+            with self.db.atomic():
+                BusinessOpenInterval.delete().execute()
+                for hours in BusinessHours.select().iterator():
+                    try:
+                        self.insert_open_intervals(hours.business_id, hours.to_dict())
+                    except (ValueError, TypeError) as e:
+                        logger.error(f"Skipping malformed hours for {hours.business_id}: {e}")
+            logger.info("Open-hours index rebuilt.")
+        except Exception as e:
+            logger.error(f"Error rebuilding open-hours index: {e}")
+
+    @staticmethod
+    def _open_at_subquery(minute: int):
+        """
+        Selects ids of businesses open at the given minute of the week. Intervals are split at
+        midnight, so none is longer than a day: bounding start_minute on both sides keeps the
+        index scan to one day of intervals instead of everything that starts before `minute`.
+        """
+        return BusinessOpenInterval.select(BusinessOpenInterval.business).where(
+            (BusinessOpenInterval.start_minute > minute - MINUTES_PER_DAY) &
+            (BusinessOpenInterval.start_minute <= minute) &
+            (BusinessOpenInterval.end_minute > minute)
+        )
+
+    @staticmethod
+    def _open_at_condition(open_at):
+        """
+        Condition on Business.id for businesses open at a minute of the week (their local time),
+        or at OPEN_NOW, which is resolved in each US business's state timezone. Businesses
+        outside the US or with an unknown state fall back to the server's local time.
+        """
+        if open_at != OPEN_NOW:
+            return Business.id.in_(DBManager._open_at_subquery(open_at))
+
+        def open_in(minute, location_condition):
+            return Business.id.in_(
+                DBManager._open_at_subquery(minute)
+                .join(Location, JOIN.LEFT_OUTER, on=(Location.business == BusinessOpenInterval.business))
+                .where(location_condition)
+            )
+
+        now = datetime.now(timezone.utc)
+        is_us = Location.country == "US"
+        conditions = [
+            open_in(minute_of_week(now.astimezone(ZoneInfo(zone))), is_us & Location.state.in_(states))
+            for zone, states in US_STATE_TIMEZONES.items()
+        ]
+        known_states = [state for states in US_STATE_TIMEZONES.values() for state in states]
+        conditions.append(open_in(
+            minute_of_week(datetime.now()),
+            Location.id.is_null() | ~is_us | Location.state.not_in(known_states)
+        ))
+        return reduce(operator.or_, conditions)
+
+    def filter_open_business_ids(self, business_ids: list[str], open_at) -> set[str]:
+        """Returns the subset of business_ids that are open at open_at (see _open_at_condition)."""
+        query = Business.select(Business.id).where(
+            Business.id.in_(business_ids) &
+            self._open_at_condition(open_at)
+        )
+        return {b.id for b in query}
+
+    ### 🔹 Search Terms ###
+
+    @staticmethod
+    def canonical_key(term, location, sort_by="best_match") -> str:
+        """Builds the cache key for a search: normalized term, alias-resolved location and sort order."""
+        location = normalize_location(location)
+        alias = LocationAlias.get_or_none(LocationAlias.alias == location)
+        return build_canonical_key(normalize_text(term), alias.canonical if alias else location, sort_by)
+
     @staticmethod
     def insert_search_term(term, location, sort_by, limit, max_results) -> "SearchTerm | None":
-        """Stores a search term in the database (if not already present)."""
+        """Stores a search term in the database, or extends the cached one with the same canonical key."""
         try:
             search_term, created = SearchTerm.get_or_create(
-                term=term,
-                location=location,
-                sort_by=sort_by,
-                limit=limit,
-                max_results=max_results
+                canonical_key=DBManager.canonical_key(term, location, sort_by),
+                defaults={
+                    "term": term,
+                    "location": location,
+                    "sort_by": sort_by,
+                    "limit": limit,
+                    "max_results": max_results
+                }
             )
+            if not created and max_results > search_term.max_results:
+                search_term.limit = limit
+                search_term.max_results = max_results
+                search_term.save()
             return search_term  # Return the object for linking with BusinessSearch
         except Exception as e:
             logger.error(f"Error inserting search term: {e}")
@@ -170,44 +308,246 @@ class DBManager:
 
     @staticmethod
     def is_search_cached(term, location, sort_by="best_match", limit=10, max_results=50) -> bool:
-        """Checks if a search term exists in the cache (i.e., has stored businesses)."""
+        """
+        Checks if a search is in the cache with at least max_results fetched.
+        The page size (limit) does not affect which businesses are cached, so it is not compared.
+        """
         return SearchTerm.select().where(
-            (SearchTerm.term == term) &
-            (SearchTerm.location == location) &
-            (SearchTerm.sort_by == sort_by)&
-            (SearchTerm.limit == limit)&
-            (SearchTerm.max_results == max_results)
+            (SearchTerm.canonical_key == DBManager.canonical_key(term, location, sort_by)) &
+            (SearchTerm.max_results >= max_results)
         ).exists()
 
-    def get_businesses_for_search(self, term, location, sort_by="best_match"):
+    def get_businesses_for_search(self, term, location, sort_by="best_match", max_results=None):
         """Fetches businesses from cache if the search term exists."""
-        if self.is_search_cached(term, location, sort_by):
-            logger.info(f"No cached data for {term} in {location}.")
-            return None  # Indicate that fresh data needs to be fetched
-
         try:
-            search_term = SearchTerm.get(
-                (SearchTerm.term == term) &
-                (SearchTerm.location == location) &
-                (SearchTerm.sort_by == sort_by)
+            search_term = SearchTerm.get_or_none(SearchTerm.canonical_key == self.canonical_key(term, location, sort_by))
+            if not search_term:
+                logger.info(f"No cached data for {term} in {location}.")
+                return None  # Indicate that fresh data needs to be fetched
+
+            businesses = (
+                Business
+                .select()
+                .join(BusinessSearch, on=(BusinessSearch.business == Business.id))
+                .where(BusinessSearch.search_term == search_term)
+                .order_by(BusinessSearch.id)
             )
-            businesses = [bs.business.to_dict() for bs in search_term.businesses]
-            return businesses
+            if max_results:
+                businesses = businesses.limit(max_results)
+            # One query per related table instead of several per business
+            businesses = businesses.prefetch(Location, BusinessCategory, Category, BusinessHours, Attribute)
+            return [b.to_dict() for b in businesses]
         except Exception as e:
             logger.error(f"Error fetching businesses for search: {e}")
             return []
 
+    def migrate_search_terms(self):
+        """Adds SearchTerm.canonical_key to databases created before it existed."""
+        table = SearchTerm._meta.table_name
+        if table not in self.db.get_tables():
+            return
+        if "canonical_key" in {column.name for column in self.db.get_columns(table)}:
+            return
+
+        logger.info("Adding canonical keys to search terms...")
+        with self.db.atomic():
+            migrate(SqliteMigrator(self.db).add_column(table, "canonical_key", CharField(null=True)))
+            # Raw (term, location, sort_by, limit, max_results) uniqueness is superseded by canonical_key
+            self.db.execute_sql(f'DROP INDEX IF EXISTS "{table}_term_location_sort_by_limit_max_results"')
+
+    def canonicalize_search_terms(self) -> int:
+        """
+        Recomputes every SearchTerm's canonical key and merges search terms that share one:
+        the oldest is kept with the largest max_results, and the others' BusinessSearch links
+        are moved to it. Run again after changing location aliases. Returns the number merged,
+        or 0 if the changes were rolled back.
+        """
+        aliases = {a.alias: a.canonical for a in LocationAlias.select()}
+        groups = {}
+        for search_term in SearchTerm.select().order_by(SearchTerm.id):
+            key = canonical_search_key(search_term.term, search_term.location, search_term.sort_by, aliases)
+            groups.setdefault(key, []).append(search_term)
+
+        merged = 0
+        try:
+            with self.db.atomic():
+                # Clear keys first so reassigning them can't collide with stale ones
+                SearchTerm.update(canonical_key=None).execute()
+
+                for key, (keeper, *duplicates) in groups.items():
+                    if duplicates:
+                        duplicate_ids = [d.id for d in duplicates]
+                        BusinessSearch.update(search_term=keeper).where(
+                            BusinessSearch.search_term.in_(duplicate_ids)
+                        ).execute()
+                        SearchTerm.delete().where(SearchTerm.id.in_(duplicate_ids)).execute()
+
+                        largest = max(duplicates, key=lambda d: d.max_results)
+                        if largest.max_results > keeper.max_results:
+                            keeper.limit, keeper.max_results = largest.limit, largest.max_results
+                        merged += len(duplicates)
+
+                    keeper.canonical_key = key
+                    keeper.save()
+
+                # Drop links that became duplicates when search terms were merged
+                first_links = BusinessSearch.select(fn.MIN(BusinessSearch.id)).group_by(
+                    BusinessSearch.search_term, BusinessSearch.business
+                )
+                BusinessSearch.delete().where(BusinessSearch.id.not_in(first_links)).execute()
+
+            logger.info(f"Canonicalized {len(groups)} search terms, merged {merged} duplicates.")
+            return merged
+        except Exception as e:
+            logger.error(f"Error canonicalizing search terms: {e}")
+            return 0  # The transaction rolled back, so nothing was merged
+
+    def add_location_alias(self, alias: str, canonical: str):
+        """Adds or updates a location alias and re-keys cached searches accordingly."""
+        LocationAlias.replace(alias=normalize_location(alias), canonical=normalize_location(canonical)).execute()
+        return self.canonicalize_search_terms()
+
+    @staticmethod
+    def retire_location_aliases():
+        """
+        Removes aliases seeded by earlier versions that are now ambiguous, and aliases that
+        normalize_location makes unreachable (e.g. "dallas tx", now looked up as "dallas").
+        """
+        unreachable = [a.alias for a in LocationAlias.select() if normalize_location(a.alias) != a.alias]
+        for alias, canonical in RETIRED_LOCATION_ALIASES.items():
+            LocationAlias.delete().where(
+                (LocationAlias.alias == alias) & (LocationAlias.canonical == canonical)
+            ).execute()
+        if unreachable:
+            LocationAlias.delete().where(LocationAlias.alias.in_(unreachable)).execute()
+
+    @staticmethod
+    def canonical_keys_outdated() -> bool:
+        """Checks whether any stored search is missing its canonical key or was keyed under other rules."""
+        aliases = {a.alias: a.canonical for a in LocationAlias.select()}
+        return any(
+            search_term.canonical_key != canonical_search_key(
+                search_term.term, search_term.location, search_term.sort_by, aliases)
+            for search_term in SearchTerm.select(
+                SearchTerm.term, SearchTerm.location, SearchTerm.sort_by, SearchTerm.canonical_key)
+        )
+
     @staticmethod
     def get_all_businesses():
         """Retrieves all businesses with related data."""
         query = Business.select().prefetch(Location, BusinessCategory, Category, BusinessHours, Attribute)
         return [b.to_dict() for b in query]
 
+    ### 🔹 Local Queries ###
+
+    @staticmethod
+    def _apply_business_filters(query, filters: dict):
+        """Restricts a query selecting from Business to the given filters (None values are ignored)."""
+        conditions = []
+
+        if filters.get("min_rating") is not None:
+            conditions.append(Business.rating >= filters["min_rating"])
+        if filters.get("max_rating") is not None:
+            conditions.append(Business.rating <= filters["max_rating"])
+        if filters.get("min_review_count") is not None:
+            conditions.append(Business.review_count >= filters["min_review_count"])
+        if filters.get("max_review_count") is not None:
+            conditions.append(Business.review_count <= filters["max_review_count"])
+        if filters.get("price"):
+            conditions.append(Business.price.in_(filters["price"]))
+        if filters.get("is_closed") is not None:
+            conditions.append(Business.is_closed == filters["is_closed"])
+        if filters.get("category"):
+            conditions.append(Business.id.in_(
+                BusinessCategory
+                .select(BusinessCategory.business)
+                .join(Category, on=(BusinessCategory.category == Category.id))
+                .where(Category.alias == filters["category"])
+            ))
+        if filters.get("city"):
+            conditions.append(Business.id.in_(
+                Location.select(Location.business).where(Location.city == filters["city"])
+            ))
+        if filters.get("open_at") is not None:
+            conditions.append(DBManager._open_at_condition(filters["open_at"]))
+
+        if conditions:
+            query = query.where(*conditions)
+        return query
+
+    def query_businesses(self, filters: dict, sort_by="rating", order="desc", limit=50, offset=0,
+                         include_total=False):
+        """
+        Returns (total, has_more, businesses) for cached businesses matching the filters, sorted and
+        paginated. Counting every match costs a second pass over them, so total is None unless
+        include_total is set; has_more comes from fetching one row past the page instead.
+        """
+        sort_field = BUSINESS_SORT_FIELDS[sort_by]
+        sort_expr = sort_field.desc() if order == "desc" else sort_field.asc()
+
+        query = self._apply_business_filters(Business.select(), filters)
+        total = query.count() if include_total else None
+
+        page = query.select(Business.id).order_by(sort_expr, Business.id).limit(limit + 1).offset(offset)
+        page_ids = [b.id for b in page]
+        has_more = len(page_ids) > limit
+        page_ids = page_ids[:limit]
+
+        # Prefetch by id: prefetching from the filtered query would re-run it once per related table
+        businesses = {b.id: b for b in Business.select().where(Business.id.in_(page_ids)).prefetch(
+            Location, BusinessCategory, Category, BusinessHours, Attribute
+        )}
+        return total, has_more, [businesses[business_id].to_dict() for business_id in page_ids]
+
+    def count_businesses(self, filters: dict) -> int:
+        """Counts cached businesses matching the filters."""
+        return self._apply_business_filters(Business.select(), filters).count()
+
+    def average_rating_by(self, group_by: str, filters: dict) -> list[dict]:
+        """Aggregates business count and average rating per category or per city."""
+        count = fn.COUNT(Business.id).alias("count")
+        avg_rating = fn.AVG(Business.rating).alias("avg_rating")
+
+        if group_by == "category":
+            query = (
+                Business
+                .select(Category.alias, Category.title, count, avg_rating)
+                .join(BusinessCategory, on=(BusinessCategory.business == Business.id))
+                .join(Category, on=(BusinessCategory.category == Category.id))
+                .group_by(Category.id)
+            )
+        else:
+            query = (
+                Business
+                .select(Location.city, count, avg_rating)
+                .join(Location, on=(Location.business == Business.id))
+                .group_by(Location.city)
+            )
+
+        query = self._apply_business_filters(query, filters).order_by(SQL("count").desc())
+        rows = list(query.dicts())
+        for row in rows:
+            row["avg_rating"] = round(row["avg_rating"], 2) if row["avg_rating"] is not None else None
+        return rows
+
+    def price_distribution(self, filters: dict) -> list[dict]:
+        """Counts cached businesses per price level."""
+        # Missing prices are stored as "" from Yelp responses and NULL elsewhere; bucket them together
+        price = fn.NULLIF(Business.price, "")
+        query = (
+            Business
+            .select(price.alias("price"), fn.COUNT(Business.id).alias("count"))
+            .group_by(price)
+            .order_by(price)
+        )
+        return list(self._apply_business_filters(query, filters).dicts())
+
     def clear_all(self):
         """Deletes all records from all tables."""
         try:
             with self.db.atomic():
                 Attribute.delete().execute()
+                BusinessOpenInterval.delete().execute()
                 BusinessHours.delete().execute()
                 BusinessCategory.delete().execute()
                 Category.delete().execute()
@@ -9,20 +9,21 @@ class BaseModel(Model):
     class Meta:
         database = database_proxy
 
+class LocationAlias(BaseModel):
+    """Maps a normalized location variant ("nyc", "new york ny") to its canonical form ("new york")."""
+    alias = CharField(primary_key=True)
+    canonical = CharField()
+
 class SearchTerm(BaseModel):
     id = IntegerField(primary_key=True)  # Auto-incrementing ID
-    term = CharField(index=True)  # "pizza", "gym", etc.
-    location = CharField(index=True)  # "New York", "Los Angeles"
+    term = CharField(index=True)  # "pizza", "gym", etc., as first searched
+    location = CharField(index=True)  # "New York", "Los Angeles", as first searched
     sort_by = CharField(default="best_match")  # "best_match", "rating", "review_count", "distance"
     limit = IntegerField(default=10)  # Number of results requested per Yelp API call
     max_results = IntegerField(default=50)  # Max results to fetch using pagination
+    canonical_key = CharField(null=True, unique=True)  # "pizza|new york|best match", used for cache lookups
     created_at = DateTimeField(default=datetime.now())  # Track when the search happened
 
-    class Meta:
-        indexes = (
-            (("term", "location", "sort_by", "limit", "max_results"), True),  # Unique constraint
-        )
-
     def to_dict(self):
         """Convert SearchTerm model instance to dictionary"""
         return {
@@ -32,6 +33,7 @@ class SearchTerm(BaseModel):
             "sort_by": self.sort_by,
             "limit": self.limit,
             "max_results": self.max_results,
+            "canonical_key": self.canonical_key,
             "created_at": format_datetime(self.created_at)  # Ensure datetime is JSON serializable
         }
 
@@ -42,16 +44,22 @@ class Business(BaseModel):
     image_url = TextField(null=True)
     is_closed = BooleanField(default=False)
     url = TextField()
-    review_count = IntegerField()
-    rating = FloatField()
-    price = CharField(null=True)
+    review_count = IntegerField(index=True)
+    rating = FloatField(index=True)
+    price = CharField(null=True, index=True)
     phone = CharField(null=True)
     display_phone = CharField(null=True)
     distance = FloatField()
 
+    class Meta:
+        indexes = (
+            (("id", "rating"), False),  # Covers the rating lookups in per-category and per-city aggregates
+        )
+
     def to_dict(self):
         """Converts the model instance to a dictionary for API responses."""
-        location = self.location.get() if self.location else None
+        locations = list(self.location)  # Backref query, or a list when prefetched
+        location = locations[0] if locations else None
         return {
             "id": self.id,
             "alias": self.alias,
@@ -81,13 +89,18 @@ class Location(BaseModel):
     address1 = CharField(null=True)
     address2 = CharField(null=True)
     address3 = CharField(null=True)
-    city = CharField(index=True)
+    city = CharField()  # Indexed by the (city, business) index below
     zip_code = CharField()
     state = CharField()
     country = CharField()
     latitude = FloatField()
     longitude = FloatField()
 
+    class Meta:
+        indexes = (
+            (("city", "business"), False),  # Covers city filters and per-city aggregates
+        )
+
     def to_dict(self):
         """Convert location model instance to dictionary"""
         return {
@@ -108,7 +121,12 @@ class Category(BaseModel):
 
 class BusinessCategory(BaseModel):
     business = ForeignKeyField(Business, backref="categories", on_delete="CASCADE")
-    category = ForeignKeyField(Category, backref="businesses", on_delete="CASCADE")
+    category = ForeignKeyField(Category, backref="businesses", on_delete="CASCADE", index=False)  # See Meta.indexes
+
+    class Meta:
+        indexes = (
+            (("category", "business"), False),  # Covers category filters and per-category aggregates
+        )
 
 class BusinessHours(BaseModel):
     business = ForeignKeyField(Business, backref="business_hours", on_delete="CASCADE")
@@ -125,6 +143,17 @@ class BusinessHours(BaseModel):
             "is_overnight": self.is_overnight
         }
 
+class BusinessOpenInterval(BaseModel):
+    """BusinessHours normalized into minute-of-week ranges (0 = Monday 00:00) for "open at" lookups."""
+    business = ForeignKeyField(Business, backref="open_intervals", on_delete="CASCADE")
+    start_minute = IntegerField()  # Inclusive
+    end_minute = IntegerField()  # Exclusive
+
+    class Meta:
+        indexes = (
+            (("start_minute", "end_minute", "business"), False),  # Range lookup for open_at
+        )
+
 class Attribute(BaseModel):
     business = ForeignKeyField(Business, backref="attributes", on_delete="CASCADE")
     key = CharField()
@@ -0,0 +1,146 @@
+"""
+Streaming snapshots of the cache database.
+
+A snapshot is gzip-compressed JSON Lines:
+    {"format": "finditonyelp-snapshot", "version": 1, "created_at": ..., "tables": [...]}
+    {"table": "business", "columns": ["id", "alias", ...]}
+    ["<row values>", ...]
+    ...
+    {"end": "business", "rows": 123}
+Each table section follows the header line; tables are written parents before children.
+Rows are read and written in fixed-size batches, so memory use does not depend on the
+size of the database.
+"""
+import json
+import time
+from datetime import datetime
+
+from backend.models.db_manager import MODELS
+from backend.models.models import LocationAlias
+from backend.utils.logger import logger
+
+SNAPSHOT_FORMAT = "finditonyelp-snapshot"
+SNAPSHOT_VERSION = 1
+BATCH_SIZE = 10_000
+
+# Tables pre-populated by DBManager.initialize(), which an import overwrites instead of rejecting
+REFERENCE_MODELS = (LocationAlias,)
+
+
+def export_snapshot(db, stream) -> dict:
+    """Writes every table to a text stream. Returns the row count per table."""
+    counts = {}
+    tables = [model._meta.table_name for model in MODELS]
+    _write_line(stream, {"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION,
+                         "created_at": datetime.now().isoformat(), "tables": tables})
+
+    with db.atomic():  # One read transaction for a consistent snapshot
+        for table in tables:
+            cursor = db.execute_sql(f'SELECT * FROM "{table}"')
+            columns = [column[0] for column in cursor.description]
+            _write_line(stream, {"table": table, "columns": columns})
+
+            rows = 0
+            while batch := cursor.fetchmany(BATCH_SIZE):
+                stream.write("".join(json.dumps(row, separators=(",", ":")) + "\n" for row in batch))
+                rows += len(batch)
+
+            _write_line(stream, {"end": table, "rows": rows})
+            counts[table] = rows
+            logger.info(f"Exported {rows} rows from {table}")
+
+    return counts
+
+
+def import_snapshot(db, stream, replace: bool = False) -> dict:
+    """
+    Bulk-loads a snapshot into an empty database, or replaces its contents when `replace` is set.
+    The header is validated before anything is touched, and the whole import, including clearing
+    existing rows, runs in one transaction, so a failed import leaves the database as it was.
+    Non-unique indexes are dropped for the load and rebuilt afterwards; unique indexes stay in
+    place so duplicate rows fail the import. Returns row counts, timings and rows/sec.
+    """
+    models = {model._meta.table_name: model for model in MODELS}
+    tables = list(models)
+
+    header = json.loads(stream.readline() or "{}")
+    if header.get("format") != SNAPSHOT_FORMAT or header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError("Not a supported snapshot file")
+
+    if not replace:
+        for table, model in models.items():
+            if model in REFERENCE_MODELS:
+                continue
+            if db.execute_sql(f'SELECT 1 FROM "{table}" LIMIT 1').fetchone():
+                raise ValueError(f"Table {table} is not empty; import needs an empty database (or --replace)")
+
+    started = time.perf_counter()
+    counts = {}
+
+    # Durability is not needed mid-load: the transaction either commits in full or not at all
+    synchronous = db.execute_sql("PRAGMA synchronous").fetchone()[0]
+    db.execute_sql("PRAGMA synchronous = OFF")
+    try:
+        with db.atomic(), db.bind_ctx(MODELS):
+            # Children first; reference data seeded at initialization is replaced by the snapshot's copy
+            for table, model in reversed(models.items()):
+                if replace or (model in REFERENCE_MODELS and table in header["tables"]):
+                    db.execute_sql(f'DELETE FROM "{table}"')
+
+            for table in tables:
+                for index in db.get_indexes(table):
+                    if not index.unique:
+                        db.execute_sql(f'DROP INDEX "{index.name}"')
+
+            table, sql, rows, batch = None, None, 0, []
+            for line in stream:
+                record = json.loads(line)
+
+                if isinstance(record, list):
+                    batch.append(record)
+                    if len(batch) >= BATCH_SIZE:
+                        db.cursor().executemany(sql, batch)
+                        rows += len(batch)
+                        batch = []
+                elif "table" in record:
+                    table = record["table"]
+                    if table not in models:
+                        raise ValueError(f"Unknown table in snapshot: {table}")
+                    columns = ", ".join(f'"{column}"' for column in record["columns"])
+                    placeholders = ", ".join("?" for _ in record["columns"])
+                    sql = f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders})'
+                    rows, batch = 0, []
+                elif "end" in record:
+                    if batch:
+                        db.cursor().executemany(sql, batch)
+                        rows += len(batch)
+                        batch = []
+                    if rows != record["rows"]:
+                        raise ValueError(f"Truncated snapshot: {table} has {rows} of {record['rows']} rows")
+                    counts[table] = rows
+                    logger.info(f"Imported {rows} rows into {table}")
+
+            missing = set(header["tables"]) - set(counts)
+            if missing:
+                raise ValueError(f"Truncated snapshot: missing tables {sorted(missing)}")
+
+            load_seconds = time.perf_counter() - started
+            for model in MODELS:
+                model._schema.create_indexes(safe=True)
+            index_seconds = time.perf_counter() - started - load_seconds
+    finally:
+        db.execute_sql(f"PRAGMA synchronous = {int(synchronous)}")
+
+    total_rows = sum(counts.values())
+    total_seconds = time.perf_counter() - started
+    return {
+        "tables": counts,
+        "rows": total_rows,
+        "load_seconds": load_seconds,
+        "index_seconds": index_seconds,
+        "rows_per_sec": total_rows / total_seconds if total_seconds else 0.0,
+    }
+
+
+def _write_line(stream, record: dict):
+    stream.write(json.dumps(record) + "\n")
@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Query, HTTPException, Depends
+from backend.utils.logger import logger
+from backend.models.db_manager import db_manager, BUSINESS_SORT_FIELDS
+from backend.utils.utils import parse_open_at
+
+router = APIRouter()
+
+
+def business_filters(
+        min_rating: float | None = Query(None, title="Min Rating", description="Minimum rating (inclusive)"),
+        max_rating: float | None = Query(None, title="Max Rating", description="Maximum rating (inclusive)"),
+        price: list[str] | None = Query(None, title="Price", description="Price levels to include (e.g., $, $$); repeatable"),
+        min_review_count: int | None = Query(None, title="Min Review Count"),
+        max_review_count: int | None = Query(None, title="Max Review Count"),
+        is_closed: bool | None = Query(None, title="Is Closed"),
+        category: str | None = Query(None, title="Category", description="Category alias (e.g., pizza, gyms)"),
+        city: str | None = Query(None, title="City"),
+        open_at: str | None = Query(None, title="Open At",
+                                    description="'now' (in each business's timezone) or the business's local "
+                                                "wall-clock time as an ISO datetime without offset (e.g., 2025-02-14T21:30)"),
+) -> dict:
+    """Collects the filters shared by the local business query endpoints."""
+    try:
+        open_at_value = parse_open_at(open_at) if open_at else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid open_at: {open_at}")
+
+    return {
+        "min_rating": min_rating,
+        "max_rating": max_rating,
+        "price": price,
+        "min_review_count": min_review_count,
+        "max_review_count": max_review_count,
+        "is_closed": is_closed,
+        "category": category,
+        "city": city,
+        "open_at": open_at_value,
+    }
+
+
+@router.get("/businesses")
+def list_businesses(
+        filters: dict = Depends(business_filters),
+        sort_by: str = Query("rating", title="Sort By", description="Sort by rating, review_count, distance, or name"),
+        order: str = Query("desc", title="Order", description="asc or desc"),
+        limit: int = Query(50, title="Limit", description="Number of results per page (max 500)"),
+        offset: int = Query(0, title="Offset"),
+        include_total: bool = Query(False, title="Include Total",
+                                    description="Also count every match (an extra pass over them on large caches)"),
+) -> dict:
+    """Lists cached businesses matching the filters, without calling Yelp."""
+    if sort_by not in BUSINESS_SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort_by: {sort_by}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail=f"Invalid order: {order}")
+
+    try:
+        limit = max(1, min(limit, 500))
+        total, has_more, businesses = db_manager.query_businesses(filters, sort_by, order, limit, max(offset, 0),
+                                                                  include_total)
+        return {"total": total, "has_more": has_more, "businesses": businesses}
+
+    except Exception as e:
+        logger.error(f"Error querying businesses: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/businesses/count")
+def count_businesses(filters: dict = Depends(business_filters)) -> dict:
+    """Counts cached businesses matching the filters."""
+    try:
+        return {"count": db_manager.count_businesses(filters)}
+    except Exception as e:
+        logger.error(f"Error counting businesses: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/businesses/stats/rating")
+def rating_stats(
+        filters: dict = Depends(business_filters),
+        group_by: str = Query("category", title="Group By", description="category or city"),
+) -> dict:
+    """Returns business count and average rating per category or city."""
+    if group_by not in ("category", "city"):
+        raise HTTPException(status_code=400, detail=f"Invalid group_by: {group_by}")
+
+    try:
+        return {"group_by": group_by, "groups": db_manager.average_rating_by(group_by, filters)}
+    except Exception as e:
+        logger.error(f"Error aggregating ratings: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/businesses/stats/price")
+def price_stats(filters: dict = Depends(business_filters)) -> dict:
+    """Returns the number of businesses per price level."""
+    try:
+        return {"prices": db_manager.price_distribution(filters)}
+    except Exception as e:
+        logger.error(f"Error aggregating prices: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
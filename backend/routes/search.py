@@ -3,6 +3,8 @@ from backend.utils.logger import logger
 from backend.services.yelp_service import get_or_fetch_businesses
 from backend.utils.file_handler import save_to_csv
 from backend.models.db_manager import db_manager
+from backend.utils.utils import parse_open_at
+import asyncio
 import re
 
 router = APIRouter()
@@ -15,9 +17,18 @@ async def search_businesses(
                              description="Sort by best_match, rating, review_count, or distance"),
         limit: int = Query(50, title="Limit", description="Number of results per request (max 50)"),
         max_results: int = Query(50, title="Max Results", description="Total number of results to retrieve (max 1000)"),
+        open_at: str | None = Query(None, title="Open At",
+                                    description="Only keep businesses open at 'now' (in each business's timezone) or at "
+                                                "the business's local wall-clock time as an ISO datetime without offset "
+                                                "(e.g., 2025-02-14T21:30)"),
 ) -> dict:
     """Search businesses on Yelp using the provided term and location, with optional database storage."""
 
+    try:
+        open_at_value = parse_open_at(open_at) if open_at else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid open_at: {open_at}")
+
     try:
         max_results = min(max_results, 1000)  # Yelp API limit
         logger.info(f"Searching Yelp for: term='{term}', location='{location}', sort_by='{sort_by}', max_results={max_results}")
@@ -28,6 +39,11 @@ async def search_businesses(
             logger.error(f"No businesses found for {term} in {location}")
             raise HTTPException(status_code=404, detail="No businesses found")
 
+        if open_at_value is not None:
+            open_ids = await asyncio.to_thread(db_manager.filter_open_business_ids, [b["id"] for b in results],
+                                               open_at_value)
+            results = [b for b in results if b["id"] in open_ids]
+
         return {"businesses": results}
 
     except HTTPException as http_exc:
@@ -47,7 +63,7 @@ def export_to_csv(
 ):
     """Exports the latest search results from the database to a CSV file."""
     try:
-        businesses = db_manager.get_businesses_for_search(term, location, sort_by)[:max_results]
+        businesses = db_manager.get_businesses_for_search(term, location, sort_by, max_results) or []
         logger.info(f"Fetched {len(businesses)} businesses from cache for {term} in {location}")
         if not businesses:
             raise HTTPException(status_code=400, detail="No search results to export. Perform a search first.")
@@ -63,6 +79,9 @@ def export_to_csv(
 
         return {"message": "CSV export successful", "file": file_path}
 
+    except HTTPException as http_exc:
+        logger.error(http_exc)
+        raise http_exc  # Pass HTTP errors directly
     except Exception as e:
         logger.error(f"Error exporting CSV: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
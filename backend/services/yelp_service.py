@@ -1,11 +1,14 @@
 import httpx
 import asyncio
+import threading
 
 from backend.models.db_manager import db_manager
-from backend.utils.constants import YELP_API_URL, HEADERS
+from backend.utils.constants import YELP_API_URL, YELP_RATE_LIMIT_WAIT, HEADERS
 from backend.utils.logger import logger
 from backend.utils.utils import parse_yelp_response, handle_rate_limit, log_request_error
 
+_cache_write_lock = threading.Lock()
+
 
 async def fetch_yelp_data(term: str, location: str, sort_by: str, limit: int, max_results: int) -> list[dict]:
     """Fetch businesses from Yelp API with pagination."""
@@ -28,8 +31,8 @@ async def fetch_yelp_data(term: str, location: str, sort_by: str, limit: int, ma
                 }, timeout=10.0)
 
                 if handle_rate_limit(response):
-                    logger.info("waiting for 60 seconds")
-                    await asyncio.sleep(60)
+                    logger.info(f"waiting for {YELP_RATE_LIMIT_WAIT} seconds")
+                    await asyncio.sleep(YELP_RATE_LIMIT_WAIT)
                     continue
 
                 response.raise_for_status()
@@ -50,12 +53,26 @@ async def fetch_yelp_data(term: str, location: str, sort_by: str, limit: int, ma
 
 async def get_or_fetch_businesses(term: str, location: str, sort_by: str = "best_match", limit: int = 50, max_results: int = 50):
     """Checks the database cache, otherwise fetches from Yelp API."""
-    if db_manager.is_search_cached(term=term, location=location, sort_by=sort_by, limit=limit, max_results=max_results):
-        return db_manager.get_businesses_for_search(term=term, location=location, sort_by=sort_by)
+    # Database calls run in worker threads so a slow query or a lock wait doesn't stall the event loop
+    if await asyncio.to_thread(db_manager.is_search_cached, term=term, location=location, sort_by=sort_by,
+                               limit=limit, max_results=max_results):
+        return await asyncio.to_thread(db_manager.get_businesses_for_search, term=term, location=location,
+                                       sort_by=sort_by, max_results=max_results)
 
     businesses = await fetch_yelp_data(term=term, location=location, sort_by=sort_by, limit=limit, max_results=max_results)
     if businesses:
-        search_term = db_manager.insert_search_term(term=term, location=location, sort_by=sort_by, limit=limit, max_results=max_results)
+        await asyncio.to_thread(cache_businesses, term, location, sort_by, limit, max_results, businesses)
+    return businesses
+
+def cache_businesses(term: str, location: str, sort_by: str, limit: int, max_results: int, businesses: list[dict]):
+    """Stores fetched businesses under their search term, in one transaction."""
+    # SQLite allows one writer at a time; queueing here is fair, unlike SQLite's busy-timeout polling,
+    # under which concurrent searches were failing with "database is locked"
+    with _cache_write_lock, db_manager.db.atomic():
+        search_term = db_manager.insert_search_term(term=term, location=location, sort_by=sort_by, limit=limit,
+                                                    max_results=max_results)
+        if not search_term:
+            logger.error(f"Not caching results for {term} in {location}: search term could not be stored")
+            return
         for business in businesses:
             db_manager.insert_business(business, search_term)
-    return businesses
@@ -6,5 +6,9 @@ load_dotenv()
 
 YELP_API_KEY = os.getenv("YELP_API_KEY")
 
+# Overridable so the app can be pointed at a mock Yelp server (see benchmarks/)
+YELP_API_URL = os.getenv("YELP_API_URL", "https://api.yelp.com/v3/businesses/search")
+YELP_RATE_LIMIT_WAIT = float(os.getenv("YELP_RATE_LIMIT_WAIT", "60"))
+
 if not YELP_API_KEY:
     raise ValueError("Missing YELP_API_KEY in .env file")
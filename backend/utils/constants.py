@@ -1,6 +1,4 @@
-from backend.utils.config import YELP_API_KEY
-
-YELP_API_URL = "https://api.yelp.com/v3/businesses/search"
+from backend.utils.config import YELP_API_KEY, YELP_API_URL, YELP_RATE_LIMIT_WAIT
 
 HEADERS = {
     "Authorization": f"Bearer {YELP_API_KEY}",
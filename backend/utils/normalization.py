@@ -0,0 +1,63 @@
+import re
+import unicodedata
+
+from backend.utils.utils import US_STATE_TIMEZONES
+
+# Seed entries for the LocationAlias table, keyed by normalized location. Only true aliases
+# belong here: "<city>, <ST>" and ", USA" spellings are handled by normalize_location.
+# "la" is deliberately absent, since it is also the state code for Louisiana.
+# Maintain additional aliases with: python -m scripts.setup_db alias "<alias>" "<location>"
+DEFAULT_LOCATION_ALIASES = {
+    "nyc": "new york",
+    "new york city": "new york",
+    "new york new york": "new york",
+    "sf": "san francisco",
+    "philly": "philadelphia",
+    "dc": "washington dc",
+    "washington d c": "washington dc",
+}
+
+# Aliases seeded by earlier versions that are ambiguous, removed from existing databases
+RETIRED_LOCATION_ALIASES = {"la": "los angeles"}
+
+# "dc" is kept: in "Washington DC" it names the city rather than a state
+US_STATE_CODES = {state.lower() for states in US_STATE_TIMEZONES.values() for state in states} - {"dc"}
+
+
+def normalize_text(value: str) -> str:
+    """
+    Folds a free-text search value for comparison: strips accents, case-folds,
+    turns punctuation into spaces and collapses whitespace ("  Café, NY " -> "cafe ny").
+    """
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    value = re.sub(r"[\W_]+", " ", value.casefold())
+    return " ".join(value.split())
+
+
+def normalize_location(value: str) -> str:
+    """
+    Normalizes a location and drops a trailing ", USA" and US state code, so that
+    "Austin, TX, USA", "austin tx" and "Austin" compare equal. A bare state code is kept.
+    """
+    words = normalize_text(value).split()
+    if len(words) > 1 and words[-1] == "usa":
+        words.pop()
+    if len(words) > 1 and words[-1] in US_STATE_CODES:
+        words.pop()
+    return " ".join(words)
+
+
+def build_canonical_key(term: str, location: str, sort_by: str) -> str:
+    """
+    Builds the SearchTerm cache key from an already normalized term and resolved location.
+    Page size and result count are not part of the key: a cached search answers any
+    request for up to as many results as it stored.
+    """
+    return f"{term}|{location}|{normalize_text(sort_by) or 'best match'}"
+
+
+def canonical_search_key(term: str, location: str, sort_by: str, aliases: dict) -> str:
+    """Normalizes a raw search and resolves its location through an alias mapping."""
+    location = normalize_location(location)
+    return build_canonical_key(normalize_text(term), aliases.get(location, location), sort_by)
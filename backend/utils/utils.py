@@ -8,6 +8,67 @@ def format_datetime(dt):
         return dt.isoformat()  # Standard ISO format
     return str(dt)  # Fallback for unexpected types
 
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+def minute_of_week(dt: datetime) -> int:
+    """Converts a datetime to minutes since Monday 00:00 (Yelp's day 0)."""
+    return dt.weekday() * MINUTES_PER_DAY + dt.hour * 60 + dt.minute
+
+OPEN_NOW = "now"
+
+# Primary IANA timezone per US state, used to resolve open_at=now in each business's local time.
+# States spanning two zones are mapped to the zone most of their population lives in.
+US_STATE_TIMEZONES = {
+    "America/New_York": ["CT", "DC", "DE", "FL", "GA", "IN", "KY", "MA", "MD", "ME", "MI", "NC", "NH", "NJ",
+                         "NY", "OH", "PA", "RI", "SC", "VA", "VT", "WV"],
+    "America/Chicago": ["AL", "AR", "IA", "IL", "KS", "LA", "MN", "MO", "MS", "ND", "NE", "OK", "SD", "TN",
+                        "TX", "WI"],
+    "America/Denver": ["CO", "ID", "MT", "NM", "UT", "WY"],
+    "America/Phoenix": ["AZ"],
+    "America/Los_Angeles": ["CA", "NV", "OR", "WA"],
+    "America/Anchorage": ["AK"],
+    "Pacific/Honolulu": ["HI"],
+    "America/Puerto_Rico": ["PR"],
+}
+
+def parse_open_at(value: str) -> "int | str":
+    """
+    Parses an open_at query value. "now" is returned as OPEN_NOW and resolved per business
+    timezone at query time. An ISO 8601 datetime such as "2025-02-14T21:30" is the business's
+    local wall-clock time and is converted to a minute of the week; values with a UTC offset
+    are rejected, since one instant maps to different local times in different cities.
+    """
+    if value.strip().lower() == OPEN_NOW:
+        return OPEN_NOW
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is not None:
+        raise ValueError("open_at must be a local time without a UTC offset")
+    return minute_of_week(dt)
+
+def hours_to_week_intervals(day: int, start_time: str, end_time: str, is_overnight: bool = False) -> list[tuple[int, int]]:
+    """
+    Converts a Yelp opening-hours entry ("0900"-style times) into half-open [start, end)
+    minute-of-week intervals. Ranges crossing midnight are split at the day boundary,
+    and Sunday-night ranges wrap around to Monday morning.
+    """
+    start = day * MINUTES_PER_DAY + int(start_time[:2]) * 60 + int(start_time[2:])
+    end = day * MINUTES_PER_DAY + int(end_time[:2]) * 60 + int(end_time[2:])
+
+    if is_overnight or end <= start:
+        end += MINUTES_PER_DAY
+
+    intervals = []
+    day_end = (day + 1) * MINUTES_PER_DAY
+    if end > day_end:
+        intervals.append((start, day_end))
+        start = day_end
+    if start >= MINUTES_PER_WEEK:
+        start -= MINUTES_PER_WEEK
+        end -= MINUTES_PER_WEEK
+    intervals.append((start, end))
+    return intervals
+
 def parse_yelp_response(data: dict) -> list[dict]:
     """Extract relevant business data from Yelp API response."""
     businesses = []
@@ -71,7 +132,7 @@ def parse_yelp_response(data: dict) -> list[dict]:
 def handle_rate_limit(response: httpx.Response):
     """Detects if rate limit is exceeded and waits before retrying."""
     if response.status_code == 429:
-        logger.warning("Rate limit exceeded. Sleeping for 60 seconds...")
+        logger.warning("Rate limit exceeded.")
         return True
     return False
 
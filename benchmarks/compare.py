@@ -0,0 +1,64 @@
+"""
+Compares two benchmark result files and fails on regressions.
+
+    python -m benchmarks.compare baseline.json current.json --threshold 0.15
+
+A scenario regresses when its p95 latency grows, or its throughput drops, by more
+than the threshold (a fraction of the baseline value). Exits with status 1 on regression.
+"""
+import argparse
+import json
+import sys
+
+# metric -> True if higher is better
+METRICS = {
+    "p95_ms": False,
+    "throughput": True,
+}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Returns a human-readable line for every metric that regressed beyond the threshold."""
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        result = current["scenarios"].get(name)
+        if result is None:
+            continue
+
+        for metric, higher_is_better in METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+
+            change = (new - old) / old
+            if (higher_is_better and change < -threshold) or (not higher_is_better and change > threshold):
+                regressions.append(f"{name}.{metric}: {old:.2f} -> {new:.2f} ({change:+.1%})")
+
+        if result.get("errors", 0) > base.get("errors", 0):
+            regressions.append(f"{name}.errors: {base.get('errors', 0)} -> {result['errors']}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check benchmark results for regressions.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative change (default 0.15)")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions = compare(baseline, current, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print("No regressions.")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Deterministic synthetic Yelp corpus.
+
+Businesses are generated from a seed and a (term, location) pair, so the mock Yelp
+server returns the same pages on every run, and large database fixtures can be
+rebuilt with identical contents for comparable benchmark runs.
+
+Build a fixture database:
+    python -m benchmarks.corpus --businesses 1000000 --out bench.db
+"""
+import argparse
+import random
+import re
+import time
+
+from peewee import chunked
+
+CATEGORIES = [
+    ("pizza", "Pizza"), ("italian", "Italian"), ("mexican", "Mexican"), ("sushi", "Sushi Bars"),
+    ("burgers", "Burgers"), ("coffee", "Coffee & Tea"), ("bars", "Bars"), ("cocktailbars", "Cocktail Bars"),
+    ("gyms", "Gyms"), ("yoga", "Yoga"), ("bakeries", "Bakeries"), ("chinese", "Chinese"),
+    ("thai", "Thai"), ("indpak", "Indian"), ("vegan", "Vegan"), ("breakfast_brunch", "Breakfast & Brunch"),
+]
+
+CITIES = [
+    ("New York", "NY", 40.7128, -74.0060), ("Los Angeles", "CA", 34.0522, -118.2437),
+    ("Chicago", "IL", 41.8781, -87.6298), ("Houston", "TX", 29.7604, -95.3698),
+    ("Phoenix", "AZ", 33.4484, -112.0740), ("Philadelphia", "PA", 39.9526, -75.1652),
+    ("San Antonio", "TX", 29.4241, -98.4936), ("San Diego", "CA", 32.7157, -117.1611),
+    ("Dallas", "TX", 32.7767, -96.7970), ("San Francisco", "CA", 37.7749, -122.4194),
+]
+
+PRICES = ["$", "$$", "$$$", "$$$$", None]
+
+HOURS_PATTERNS = [
+    # (start, end, is_overnight) per open day
+    [("0900", "2100", False)],
+    [("1100", "1430", False), ("1700", "2200", False)],  # Split lunch/dinner shifts
+    [("1800", "0200", True)],  # Late-night
+    [("0000", "0000", True)],  # Open 24 hours
+]
+
+ATTRIBUTE_KEYS = ["outdoor_seating", "wheelchair_accessible", "good_for_kids", "delivery", "takeout"]
+
+
+def slugify(value: str) -> str:
+    """Lower-cases a value and collapses non-alphanumerics into dashes."""
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+
+
+def make_business(business_id: str, seed: int = 0, term: str | None = None, city: tuple | None = None) -> dict:
+    """Generates one business in the raw Yelp /v3/businesses/search format."""
+    rng = random.Random(f"{seed}:{business_id}")
+    city_name, state, lat, lon = city or rng.choice(CITIES)
+
+    categories = rng.sample(CATEGORIES, rng.randint(1, 3))
+    if term:
+        # Make sure the business plausibly matches the search term
+        categories[0] = (slugify(term), term.title())
+
+    pattern = rng.choice(HOURS_PATTERNS)
+    open_days = sorted(rng.sample(range(7), rng.randint(5, 7)))
+    hours = [
+        {"day": day, "start": start, "end": end, "is_overnight": is_overnight}
+        for day in open_days for start, end, is_overnight in pattern
+    ]
+
+    name = f"{rng.choice(['The', 'Old', 'Little', 'Golden', 'Blue'])} {categories[0][1]} {business_id[-6:]}"
+    phone = f"+1{rng.randint(2000000000, 9999999999)}"
+
+    return {
+        "id": business_id,
+        "alias": slugify(f"{name}-{business_id}"),
+        "name": name,
+        "image_url": f"https://s3-media.example.com/{business_id}.jpg",
+        "is_closed": rng.random() < 0.05,
+        "url": f"https://www.yelp.com/biz/{business_id}",
+        "review_count": int(rng.paretovariate(1.2) * 5),
+        "categories": [{"alias": alias, "title": title} for alias, title in categories],
+        "rating": rng.choice([1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0]),
+        "coordinates": {"latitude": lat + rng.uniform(-0.2, 0.2), "longitude": lon + rng.uniform(-0.2, 0.2)},
+        "price": rng.choice(PRICES),
+        "location": {
+            "address1": f"{rng.randint(1, 9999)} {rng.choice(['Main', 'Oak', 'Park', 'Broadway'])} St",
+            "address2": "",
+            "address3": "",
+            "city": city_name,
+            "zip_code": f"{rng.randint(10000, 99999)}",
+            "country": "US",
+            "state": state,
+        },
+        "phone": phone,
+        "display_phone": f"({phone[2:5]}) {phone[5:8]}-{phone[8:]}",
+        "distance": round(rng.uniform(50, 20000), 2),
+        "business_hours": [{"open": hours, "hours_type": "REGULAR", "is_open_now": False}],
+        "attributes": {key: rng.random() < 0.5 for key in rng.sample(ATTRIBUTE_KEYS, 3)},
+    }
+
+
+def search_results(term: str, location: str, offset: int, limit: int, total: int, seed: int = 0) -> dict:
+    """Returns one page of a deterministic search, shaped like the Yelp search response."""
+    prefix = f"{slugify(term)}-{slugify(location)}"
+    city = next((c for c in CITIES if c[0].lower() == location.strip().lower()), None)
+    end = min(offset + limit, total)
+    return {
+        "businesses": [make_business(f"{prefix}-{i:06d}", seed, term, city) for i in range(offset, end)],
+        "total": total,
+    }
+
+
+def iter_businesses(count: int, seed: int = 0):
+    """Yields `count` raw businesses that don't belong to any particular search."""
+    for i in range(count):
+        yield make_business(f"synthetic-{i:09d}", seed)
+
+
+def _bulk_insert(db, model, rows: list[dict]):
+    """
+    Inserts plain dict rows with a single executemany. Generating SQL through peewee's
+    insert_many dominates fixture build time at this scale, so it is bypassed here.
+    """
+    if not rows:
+        return
+    columns = list(rows[0])
+    fields = [model._meta.fields[column] for column in columns]
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        model._meta.table_name,
+        ", ".join(f'"{field.column_name}"' for field in fields),
+        ", ".join("?" for _ in fields),
+    )
+    db.cursor().executemany(sql, [tuple(field.db_value(row[field.name]) for field in fields) for row in rows])
+
+
+def build_database(db_path: str, count: int, seed: int = 0, batch_size: int = 5000) -> float:
+    """
+    Populates a database with `count` synthetic businesses using bulk inserts.
+    Businesses are spread over one SearchTerm per batch. Returns businesses/sec.
+    """
+    from backend.models.db_manager import DBManager
+    from backend.models.models import Business, Location, Category, BusinessCategory, BusinessHours, \
+        BusinessOpenInterval, Attribute, SearchTerm, BusinessSearch
+    from backend.utils.utils import parse_yelp_response, hours_to_week_intervals
+
+    manager = DBManager(db_path=db_path)
+    db = manager.initialize()
+
+    with db.atomic():
+        for alias, title in CATEGORIES:
+            Category.get_or_create(alias=alias, defaults={"title": title})
+    category_ids = {c.alias: c.id for c in Category.select()}
+
+    started = time.perf_counter()
+    for batch_number, raw_batch in enumerate(chunked(iter_businesses(count, seed), batch_size)):
+        businesses = parse_yelp_response({"businesses": raw_batch})
+        rows = {model: [] for model in (Business, Location, BusinessCategory, BusinessHours,
+                                        BusinessOpenInterval, Attribute, BusinessSearch)}
+
+        with db.atomic():
+            term = f"synthetic-{batch_number}"
+            search_term = SearchTerm.create(term=term, location="synthetic",
+                                            canonical_key=DBManager.canonical_key(term, "synthetic"))
+
+            for b in businesses:
+                rows[Business].append({
+                    "id": b["id"], "alias": b["alias"], "name": b["name"], "image_url": b["image_url"],
+                    "is_closed": b["is_closed"], "url": b["url"], "review_count": b["review_count"],
+                    "rating": b["rating"], "price": b["price"], "phone": b["phone"],
+                    "display_phone": b["display_phone"], "distance": b["distance"],
+                })
+                rows[Location].append({"business": b["id"], **b["location"]})
+                rows[BusinessSearch].append({"search_term": search_term.id, "business": b["id"],
+                                             "searched_at": search_term.created_at})
+                for category in b["categories"]:
+                    rows[BusinessCategory].append({"business": b["id"], "category": category_ids[category["alias"]]})
+                for hours in b["business_hours"]:
+                    rows[BusinessHours].append({"business": b["id"], **hours})
+                    for start, end in hours_to_week_intervals(hours["day"], hours["start_time"], hours["end_time"],
+                                                              hours["is_overnight"]):
+                        rows[BusinessOpenInterval].append({"business": b["id"], "start_minute": start, "end_minute": end})
+                for key, value in b["attributes"].items():
+                    rows[Attribute].append({"business": b["id"], "key": key, "value": str(value)})
+
+            for model, model_rows in rows.items():
+                _bulk_insert(db, model, model_rows)
+
+    elapsed = time.perf_counter() - started
+    db.close()
+    return count / elapsed if elapsed else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a synthetic FindItOnYelp database fixture.")
+    parser.add_argument("--businesses", type=int, default=100_000, help="Number of businesses to generate")
+    parser.add_argument("--out", default="bench.db", help="SQLite database path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rate = build_database(args.out, args.businesses, args.seed)
+    print(f"Wrote {args.businesses} businesses to {args.out} ({rate:,.0f} businesses/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Local mock of Yelp's /v3/businesses/search endpoint.
+
+Serves the deterministic corpus from benchmarks.corpus with configurable response
+latency and HTTP 429 injection, so the backend can be benchmarked without API quota.
+
+Run standalone:
+    python -m benchmarks.mock_yelp --port 8900 --latency-ms 150 --rate-limit-ratio 0.05
+and start the backend with YELP_API_URL=http://127.0.0.1:8900/v3/businesses/search
+"""
+import argparse
+import asyncio
+import random
+import threading
+
+import uvicorn
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+from benchmarks.corpus import search_results
+
+
+def create_app(latency_ms: float = 0.0, jitter_ms: float = 0.0, rate_limit_ratio: float = 0.0,
+               results_per_search: int = 240, seed: int = 0) -> FastAPI:
+    """Builds the mock app. `stats` on app.state counts served and rate-limited requests."""
+    app = FastAPI(title="Mock Yelp")
+    rng = random.Random(seed)
+    app.state.stats = {"requests": 0, "rate_limited": 0}
+
+    @app.get("/v3/businesses/search")
+    async def search(
+            term: str = Query(""),
+            location: str = Query(...),
+            limit: int = Query(20),
+            offset: int = Query(0),
+            sort_by: str = Query("best_match"),
+    ):
+        app.state.stats["requests"] += 1
+
+        delay = latency_ms + rng.uniform(-jitter_ms, jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        if rng.random() < rate_limit_ratio:
+            app.state.stats["rate_limited"] += 1
+            return JSONResponse(status_code=429, content={"error": {"code": "TOO_MANY_REQUESTS_PER_SECOND"}})
+
+        if limit > 50 or offset + limit > 1000:
+            return JSONResponse(status_code=400, content={"error": {"code": "VALIDATION_ERROR"}})
+
+        return search_results(term, location, offset, limit, results_per_search, seed)
+
+    return app
+
+
+class MockYelpServer:
+    """Runs the mock app with uvicorn in a background thread."""
+
+    def __init__(self, port: int, **app_options):
+        self.app = create_app(**app_options)
+        self.server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.url = f"http://127.0.0.1:{port}/v3/businesses/search"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("Mock Yelp server failed to start")
+            threading.Event().wait(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+    @property
+    def stats(self) -> dict:
+        return self.app.state.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock Yelp search API.")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--results-per-search", type=int, default=240)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.rate_limit_ratio, args.results_per_search, args.seed)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Per-query latency of the local /api/businesses* endpoints, in-process.
+
+Runs every query in benchmarks.run.LOCAL_QUERIES through FastAPI's TestClient against an
+existing database, with no uvicorn, network or mock Yelp in the way, and prints the first
+(cold) and warm latencies of each one:
+
+    python -m benchmarks.corpus --businesses 1000000 --out bench.db
+    python -m benchmarks.queries bench.db
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import time
+
+
+def time_queries(db_path: str, urls: list[str], repeat: int) -> list[dict]:
+    """Requests each URL 1 + `repeat` times and returns the first and warm latencies in ms."""
+    os.environ.setdefault("YELP_API_KEY", "benchmark")  # Required by backend.utils.config, unused here
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    from backend.models.db_manager import db_manager
+
+    db_manager.db_path = db_path
+    results = []
+    with TestClient(app) as client:
+        for url in urls:
+            latencies, status = [], None
+            for _ in range(1 + repeat):
+                started = time.perf_counter()
+                status = client.get(url).status_code
+                latencies.append((time.perf_counter() - started) * 1000)
+            results.append({
+                "url": url,
+                "status": status,
+                "first_ms": latencies[0],
+                "min_ms": min(latencies[1:]),
+                "median_ms": statistics.median(latencies[1:]),
+            })
+    return results
+
+
+def main():
+    from benchmarks.run import LOCAL_QUERIES
+
+    parser = argparse.ArgumentParser(description="Time each local business query in-process.")
+    parser.add_argument("db", help="SQLite database, e.g. a fixture from benchmarks.corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Warm repetitions per query")
+    parser.add_argument("--out", default=None, help="Also write the results here as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)  # The app logs every request at INFO
+    results = time_queries(os.path.abspath(args.db), LOCAL_QUERIES, args.repeat)
+
+    for result in results:
+        print(f"{result['status']}  min={result['min_ms']:8.1f}ms  median={result['median_ms']:8.1f}ms  "
+              f"first={result['first_ms']:8.1f}ms  {result['url']}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Replays a search query log and reports the cache hit rate with raw vs canonical cache keys.
+
+    python -m benchmarks.replay --log queries.jsonl
+    python -m benchmarks.replay --generate 20000 --save-log queries.jsonl
+    python -m benchmarks.replay --log queries.jsonl --db businesses.db
+
+Each log line is {"term": ..., "location": ..., "sort_by": ..., "max_results": ...}; missing fields
+take the /search defaults. Without --log a deterministic synthetic log is generated over cities that
+have no entry in the seeded alias table, with variants produced mechanically (casing, whitespace,
+accents, punctuation, a ", ST" or ", USA" suffix). Keys are built by DBManager.canonical_key, so
+locations resolve through the LocationAlias table of --db, or of a freshly seeded database by default.
+"""
+import argparse
+import json
+import random
+
+from backend.models.database import database_proxy
+from backend.models.db_manager import DBManager
+
+# None of these appear in DEFAULT_LOCATION_ALIASES, so only the general normalization rules apply
+CITIES = [
+    ("Boston", "MA"), ("Seattle", "WA"), ("Austin", "TX"), ("Denver", "CO"), ("Nashville", "TN"),
+    ("Portland", "OR"), ("Atlanta", "GA"), ("Miami", "FL"), ("Minneapolis", "MN"), ("St. Louis", "MO"),
+]
+
+TERMS = ["pizza", "sushi", "coffee", "gyms", "tacos", "ramen", "bakery", "bars", "vegan", "burgers", "café", "crêpes"]
+
+
+def term_variant(rng: random.Random, term: str) -> str:
+    variant = rng.choice([term, term.title(), term.upper(), f"{term} ", f" {term}"])
+    if rng.random() < 0.3:
+        variant = variant.replace("é", "e").replace("ê", "e")
+    return variant
+
+
+def location_variant(rng: random.Random, city: str, state: str) -> str:
+    return rng.choice([city, city, city.lower(), city.upper(), f" {city}", f"{city} ",
+                       f"{city}, {state}", f"{city},{state}", f"{city.lower()} {state.lower()}",
+                       f"{city}, {state}, USA"])
+
+
+def generate_log(count: int, seed: int = 0) -> list[dict]:
+    """Zipf-distributed queries over term x city, each spelled in a random variant."""
+    rng = random.Random(seed)
+    base = [(term, city, state) for term in TERMS for city, state in CITIES]
+    rng.shuffle(base)
+    weights = [1 / (rank + 1) for rank in range(len(base))]
+
+    log = []
+    for term, city, state in rng.choices(base, weights, k=count):
+        log.append({
+            "term": term_variant(rng, term),
+            "location": location_variant(rng, city, state),
+            "sort_by": rng.choices(["best_match", "rating"], [0.8, 0.2])[0],
+            "max_results": rng.choice([50, 50, 100]),
+        })
+    return log
+
+
+def replay(log: list[dict]) -> dict:
+    """
+    Simulates the search cache over the log, against the initialized database.
+    A raw hit needs the exact (term, location, sort_by, max_results) seen before; a normalized hit
+    needs the same canonical key and max_results, which isolates what normalization alone gains;
+    a canonical hit, as the app does it, needs the canonical key with at least as many results cached.
+    """
+    raw_seen, normalized_seen, canonical_seen = set(), set(), {}
+    raw_hits = normalized_hits = canonical_hits = 0
+
+    for query in log:
+        term, location = query["term"], query["location"]
+        sort_by, max_results = query.get("sort_by", "best_match"), query.get("max_results", 50)
+
+        raw_key = (term, location, sort_by, max_results)
+        raw_hits += raw_key in raw_seen
+        raw_seen.add(raw_key)
+
+        key = DBManager.canonical_key(term, location, sort_by)
+        normalized_hits += (key, max_results) in normalized_seen
+        normalized_seen.add((key, max_results))
+
+        cached = canonical_seen.get(key, 0)
+        canonical_hits += cached >= max_results
+        canonical_seen[key] = max(cached, max_results)
+
+    total = len(log)
+    return {
+        "queries": total,
+        "raw_entries": len(raw_seen),
+        "normalized_entries": len(normalized_seen),
+        "canonical_entries": len(canonical_seen),
+        "raw_hit_rate": raw_hits / total if total else 0.0,
+        "normalized_hit_rate": normalized_hits / total if total else 0.0,
+        "canonical_hit_rate": canonical_hits / total if total else 0.0,
+        "yelp_fetches_saved": canonical_hits - raw_hits,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare search cache hit rates for raw and canonical keys.")
+    parser.add_argument("--log", help="JSONL query log to replay")
+    parser.add_argument("--db", default=":memory:", help="Database whose location aliases to use (default: fresh)")
+    parser.add_argument("--generate", type=int, default=20000, help="Synthetic log size when --log is not given")
+    parser.add_argument("--save-log", help="Write the synthetic log here")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.log:
+        with open(args.log) as f:
+            log = [json.loads(line) for line in f if line.strip()]
+    else:
+        log = generate_log(args.generate, args.seed)
+        if args.save_log:
+            with open(args.save_log, "w") as f:
+                f.writelines(json.dumps(query) + "\n" for query in log)
+
+    db = DBManager(db_path=args.db).initialize()
+    try:
+        result = replay(log)
+    finally:
+        db.close()
+        database_proxy.initialize(None)
+
+    print(json.dumps(result, indent=2))
+    print(f"Hit rate {result['raw_hit_rate']:.1%} raw -> {result['normalized_hit_rate']:.1%} normalized "
+          f"-> {result['canonical_hit_rate']:.1%} with larger cached results reused "
+          f"({result['raw_entries']} -> {result['canonical_entries']} cache entries)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+End-to-end benchmarks for backend.main:app against a mock Yelp server.
+
+Starts the mock Yelp API in-process and the backend under uvicorn in a scratch
+directory (its own businesses.db, app.log and exports/), optionally pre-populated
+with a synthetic fixture, then runs each scenario and writes the results as JSON.
+
+    python -m benchmarks.run --out benchmarks/results/run.json
+    python -m benchmarks.run --fixture-businesses 1000000 --baseline benchmarks/results/baseline.json
+    python -m benchmarks.run --fixture-db fixture_1m.db   # reuse a fixture from benchmarks.corpus.build_database
+
+Scenarios:
+    cold_search     /api/search for queries that are not cached yet (every page hits the mock)
+    cached_search   the same queries again, served from the database
+    export          /api/export for the cached queries
+    local_queries   /api/businesses filters, sorting and stats over the whole cache
+    mixed           concurrent mix of cached/cold search, local queries and stats
+    ingestion       DBManager.insert_business throughput into an empty database
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+import httpx
+
+from benchmarks.compare import compare
+from benchmarks.corpus import CITIES, build_database, search_results
+from benchmarks.mock_yelp import MockYelpServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TERMS = ["pizza", "sushi", "coffee", "gyms", "tacos", "ramen", "bakery", "bars", "vegan", "burgers"]
+
+LOCAL_QUERIES = [
+    "/api/businesses?min_rating=4&sort_by=review_count&limit=50",
+    "/api/businesses?category=pizza&city=Chicago&sort_by=rating",
+    "/api/businesses?price=$$&price=$$$&is_closed=false&sort_by=distance&order=asc",
+    "/api/businesses?open_at=2025-02-14T23:30&city=New York",
+    "/api/businesses/count?min_review_count=100",
+    "/api/businesses/stats/rating?group_by=category",
+    "/api/businesses/stats/rating?group_by=city&min_rating=3",
+    "/api/businesses/stats/price?category=bars",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def summarize(latencies: list[float], errors: int, wall_seconds: float, unit: str = "requests") -> dict:
+    """Latency percentiles (ms) and throughput (operations/sec) for one scenario."""
+    if not latencies:
+        return {unit: 0, "errors": errors}
+
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        unit: len(latencies),
+        "errors": errors,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": ordered[-1] * 1000,
+        "throughput": len(latencies) / wall_seconds if wall_seconds else 0.0,
+    }
+
+
+async def timed_get(client: httpx.AsyncClient, url: str, params: dict | None = None) -> tuple[float, str | None]:
+    """Returns the latency and None, or a short description of the failure."""
+    started = time.perf_counter()
+    try:
+        response = await client.get(url, params=params)
+        error = None if response.status_code == 200 else f"{url} HTTP {response.status_code}"
+    except httpx.HTTPError as e:
+        error = f"{url} {type(e).__name__}"
+    return time.perf_counter() - started, error
+
+
+async def run_requests(client: httpx.AsyncClient, requests: list[tuple[str, dict | None]], concurrency: int) -> dict:
+    """Issues the requests with at most `concurrency` in flight and summarizes them."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], Counter()
+
+    async def worker(url, params):
+        async with semaphore:
+            elapsed, error = await timed_get(client, url, params)
+        latencies.append(elapsed)
+        if error:
+            errors[error] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(url, params) for url, params in requests))
+    result = summarize(latencies, sum(errors.values()), time.perf_counter() - started)
+    if errors:
+        result["error_types"] = dict(errors)
+    return result
+
+
+def search_params(term: str, city: str, max_results: int) -> dict:
+    return {"term": term, "location": city, "sort_by": "best_match", "limit": 50, "max_results": max_results}
+
+
+async def run_http_scenarios(base_url: str, args) -> dict:
+    rng = random.Random(args.seed)
+    queries = [(term, city) for term in TERMS for city, *_ in CITIES]
+    rng.shuffle(queries)
+    warm, cold_pool = queries[:args.searches], queries[args.searches:]
+
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0) as client:
+        results["cold_search"] = await run_requests(
+            client, [("/api/search", search_params(t, c, args.max_results)) for t, c in warm], 1)
+
+        results["cached_search"] = await run_requests(
+            client, [("/api/search", search_params(t, c, args.max_results)) for t, c in warm] * args.repeat, 1)
+
+        results["export"] = await run_requests(
+            client, [("/api/export", {"term": t, "location": c, "sort_by": "best_match",
+                                      "max_results": args.max_results}) for t, c in warm], 1)
+
+        results["local_queries"] = await run_requests(
+            client, [(url, None) for url in LOCAL_QUERIES] * args.repeat, 1)
+
+        mixed = []
+        for _ in range(args.mixed_requests):
+            roll = rng.random()
+            if roll < 0.6:
+                mixed.append(("/api/search", search_params(*rng.choice(warm), args.max_results)))
+            elif roll < 0.9 or not cold_pool:
+                mixed.append((rng.choice(LOCAL_QUERIES), None))
+            else:
+                mixed.append(("/api/search", search_params(*cold_pool.pop(), args.max_results)))
+        results["mixed"] = await run_requests(client, mixed, args.concurrency)
+
+    return results
+
+
+def run_ingestion(workdir: str, count: int, seed: int) -> dict:
+    """Measures the real ingestion path (parse + DBManager.insert_business) into a fresh database."""
+    from backend.models.db_manager import DBManager
+    from backend.utils.utils import parse_yelp_response
+
+    # insert_business logs every row at INFO; keep the console readable while measuring
+    logging.disable(logging.INFO)
+    try:
+        manager = DBManager(db_path=os.path.join(workdir, "ingestion.db"))
+        manager.initialize()
+        search_term = manager.insert_search_term("ingestion", "synthetic", "best_match", 50, count)
+
+        raw = [business
+               for offset in range(0, count, 50)
+               for business in search_results("ingestion", "Chicago", offset, 50, count, seed)["businesses"]]
+
+        latencies = []
+        started = time.perf_counter()
+        for business in parse_yelp_response({"businesses": raw}):
+            t = time.perf_counter()
+            manager.insert_business(business, search_term)
+            latencies.append(time.perf_counter() - t)
+        result = summarize(latencies, 0, time.perf_counter() - started, unit="businesses")
+
+        manager.db.close()
+    finally:
+        logging.disable(logging.NOTSET)
+    return result
+
+
+def start_backend(workdir: str, port: int, yelp_url: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PYTHONPATH": REPO_ROOT,
+        "YELP_API_KEY": "benchmark",
+        "YELP_API_URL": yelp_url,
+        "YELP_RATE_LIMIT_WAIT": "0.2",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Backend exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError("Backend did not start within 60 seconds")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the FindItOnYelp end-to-end benchmarks.")
+    parser.add_argument("--out", default=None, help="Result file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=None, help="Compare against this result file and fail on regression")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative regression")
+    parser.add_argument("--fixture-businesses", type=int, default=0,
+                        help="Pre-populate the backend database with this many synthetic businesses")
+    parser.add_argument("--fixture-db", default=None,
+                        help="Copy this pre-built fixture database instead of building one")
+    parser.add_argument("--searches", type=int, default=20, help="Distinct queries for cold/cached search")
+    parser.add_argument("--max-results", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions for cached search and local queries")
+    parser.add_argument("--mixed-requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--ingest-businesses", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Mock Yelp response latency")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.02, help="Fraction of mock responses that are 429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    out = os.path.abspath(args.out or os.path.join(
+        REPO_ROOT, "benchmarks", "results", f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"))
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    fixture_db = os.path.abspath(args.fixture_db) if args.fixture_db else None
+
+    # The backend runs with cwd=workdir and fixtures get explicit paths, so this process never changes directory
+    with tempfile.TemporaryDirectory(prefix="finditonyelp-bench-") as workdir:
+        fixture_rate = None
+        if fixture_db:
+            shutil.copyfile(fixture_db, os.path.join(workdir, "businesses.db"))
+        elif args.fixture_businesses:
+            print(f"Building fixture with {args.fixture_businesses} businesses...")
+            fixture_rate = build_database(os.path.join(workdir, "businesses.db"), args.fixture_businesses, args.seed)
+
+        mock_options = dict(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                            rate_limit_ratio=args.rate_limit_ratio, seed=args.seed)
+        with MockYelpServer(free_port(), **mock_options) as mock:
+            port = free_port()
+            backend = start_backend(workdir, port, mock.url)
+            try:
+                scenarios = asyncio.run(run_http_scenarios(f"http://127.0.0.1:{port}", args))
+            finally:
+                backend.terminate()
+                backend.wait()
+            mock_stats = dict(mock.stats)
+
+        scenarios["ingestion"] = run_ingestion(workdir, args.ingest_businesses, args.seed)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": vars(args),
+            "mock_yelp": mock_stats,
+            "fixture_businesses_per_sec": fixture_rate,
+        },
+        "scenarios": scenarios,
+    }
+
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in scenarios.items():
+        if "p95_ms" in result:
+            print(f"{name:15} p50={result['p50_ms']:8.1f}ms  p95={result['p95_ms']:8.1f}ms  "
+                  f"throughput={result['throughput']:8.1f}/s  errors={result['errors']}")
+        else:
+            print(f"{name:15} no samples")
+        for error, count in result.get("error_types", {}).items():
+            print(f"{'':15} {count} x {error}")
+    print(f"Results written to {out}")
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
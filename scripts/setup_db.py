@@ -0,0 +1,111 @@
+"""
+Database setup and cache snapshot tool.
+
+Run from the repository root:
+    python -m scripts.setup_db init
+    python -m scripts.setup_db export snapshot.jsonl.gz
+    python -m scripts.setup_db import snapshot.jsonl.gz --db replica.db
+    python -m scripts.setup_db alias "Big Apple" "New York"
+
+Use "-" as the snapshot path to stream through stdout/stdin, e.g.
+    python -m scripts.setup_db export - | ssh replica "cd app && python -m scripts.setup_db import -"
+"""
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+import sqlite3
+import sys
+
+from peewee import DatabaseError
+
+from backend.models.db_manager import DBManager
+from backend.models.snapshot import export_snapshot, import_snapshot
+
+# gzip's default level 9 roughly doubles export time for a ~10% smaller file
+COMPRESS_LEVEL = 6
+
+
+def open_snapshot(path: str, mode: str):
+    """Opens a gzip-compressed text stream on a file, or on stdin/stdout for "-"."""
+    if path == "-":
+        raw = sys.stdout.buffer if mode == "w" else sys.stdin.buffer
+        return io.TextIOWrapper(gzip.GzipFile(fileobj=raw, mode=mode, compresslevel=COMPRESS_LEVEL), encoding="utf-8")
+    return gzip.open(path, mode + "t", compresslevel=COMPRESS_LEVEL, encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Set up the FindItOnYelp database and move cache snapshots.")
+    parser.add_argument("--db", default="businesses.db", help="SQLite database path (default businesses.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("init", help="Create the database tables and indexes")
+
+    export_parser = commands.add_parser("export", help="Write the whole cache to a compressed snapshot")
+    export_parser.add_argument("snapshot", help="Output path, or - for stdout")
+
+    import_parser = commands.add_parser("import", help="Bulk-load a snapshot into an empty database")
+    import_parser.add_argument("snapshot", help="Input path, or - for stdin")
+    import_parser.add_argument("--replace", action="store_true",
+                               help="Replace existing data (only once the snapshot has loaded successfully)")
+
+    alias_parser = commands.add_parser("alias", help="Map a location variant to a canonical location")
+    alias_parser.add_argument("alias", help='Location as users type it, e.g. "Big Apple"')
+    alias_parser.add_argument("canonical", help='Canonical location, e.g. "New York"')
+
+    commands.add_parser("canonicalize", help="Recompute search cache keys and merge duplicate searches")
+
+    args = parser.parse_args()
+
+    # Keep stdout free for streamed snapshots
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+            handler.setStream(sys.stderr)
+
+    if args.command == "export" and not os.path.exists(args.db):
+        parser.error(f"Database not found: {args.db}")
+
+    manager = DBManager(db_path=args.db)
+    db = manager.initialize()
+
+    try:
+        if args.command == "init":
+            print(f"Database ready: {args.db}", file=sys.stderr)
+
+        elif args.command == "alias":
+            merged = manager.add_location_alias(args.alias, args.canonical)
+            print(f"Alias saved; merged {merged} duplicate searches", file=sys.stderr)
+
+        elif args.command == "canonicalize":
+            merged = manager.canonicalize_search_terms()
+            print(f"Merged {merged} duplicate searches", file=sys.stderr)
+
+        elif args.command == "export":
+            with open_snapshot(args.snapshot, "w") as stream:
+                counts = export_snapshot(db, stream)
+            print(f"Exported {sum(counts.values())} rows from {args.db}", file=sys.stderr)
+
+        elif args.command == "import":
+            with open_snapshot(args.snapshot, "r") as stream:
+                result = import_snapshot(db, stream, replace=args.replace)
+            # Snapshots taken before canonical keys existed, or under older rules, need re-keying
+            manager.retire_location_aliases()
+            if manager.canonical_keys_outdated():
+                manager.canonicalize_search_terms()
+
+            for table, rows in result["tables"].items():
+                print(f"  {table:22} {rows:>12,}", file=sys.stderr)
+            print(f"Imported {result['rows']:,} rows in {result['load_seconds']:.1f}s "
+                  f"(+{result['index_seconds']:.1f}s index rebuild): {result['rows_per_sec']:,.0f} rows/sec",
+                  file=sys.stderr)
+    except (ValueError, OSError, EOFError, json.JSONDecodeError, sqlite3.Error, DatabaseError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,490 @@
+import io
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+from peewee import SqliteDatabase
+
+from backend.models.database import database_proxy
+from benchmarks.compare import compare
+from benchmarks.replay import generate_log, replay
+from backend.models.db_manager import DBManager
+from backend.models.models import Business, BusinessOpenInterval, BusinessSearch, LocationAlias, SearchTerm
+from backend.models.snapshot import export_snapshot, import_snapshot
+from backend.utils.normalization import DEFAULT_LOCATION_ALIASES, normalize_location, normalize_text
+from backend.utils.utils import hours_to_week_intervals, minute_of_week, parse_open_at, MINUTES_PER_DAY, \
+    MINUTES_PER_WEEK, OPEN_NOW
+
+
+def _business(business_id, business_hours, city="New York", categories=(), state="NY", **fields):
+    return {
+        "id": business_id,
+        "alias": business_id,
+        "name": business_id,
+        "is_closed": False,
+        "url": f"https://www.yelp.com/biz/{business_id}",
+        "review_count": 10,
+        "rating": 4.0,
+        "distance": 100.0,
+        "location": {"city": city, "state": state, "zip_code": "10001", "country": "US",
+                     "latitude": 40.0, "longitude": -73.0},
+        "categories": [{"alias": c, "title": c.title()} for c in categories],
+        "business_hours": business_hours,
+        "attributes": {},
+        **fields,
+    }
+
+
+@pytest.fixture
+def manager():
+    manager = DBManager(db_path=":memory:")
+    manager.initialize()
+    manager.search_term = manager.insert_search_term("bars", "New York", "best_match", 10, 50)
+    yield manager
+    manager.db.close()
+    database_proxy.initialize(None)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """The API against a fresh database in tmp_path, seeded with four businesses."""
+    monkeypatch.setenv("YELP_API_KEY", "test")
+    monkeypatch.chdir(tmp_path)  # /export writes to ./exports
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    from backend.models.db_manager import db_manager
+
+    monkeypatch.setattr(db_manager, "db_path", str(tmp_path / "businesses.db"))
+    with TestClient(app) as client:
+        search_term = db_manager.insert_search_term("pizza", "Chicago", "best_match", 50, 50)
+        for business in (
+            _business("a", [], "Chicago", ["pizza"], rating=4.5, review_count=100, price="$$"),
+            _business("b", [], "New York", ["pizza"], rating=3.0, review_count=10, price="$"),
+            _business("c", [], "Chicago", ["bars"], rating=5.0, review_count=50, price="", is_closed=True),
+            _business("d", [], "Chicago", ["bars", "pizza"], rating=2.0, review_count=5, price=None),
+        ):
+            db_manager.insert_business(business, search_term)
+        yield client
+    database_proxy.initialize(None)
+
+
+def _ids(response):
+    assert response.status_code == 200, response.text
+    return [b["id"] for b in response.json()["businesses"]]
+
+
+def test_businesses_filters(client):
+    assert _ids(client.get("/api/businesses", params={"category": "pizza", "city": "Chicago"})) == ["a", "d"]
+    assert _ids(client.get("/api/businesses", params={"price": ["$", "$$"]})) == ["a", "b"]
+    assert _ids(client.get("/api/businesses", params={"is_closed": True})) == ["c"]
+    assert _ids(client.get("/api/businesses", params={"min_rating": 3, "max_review_count": 60})) == ["c", "b"]
+
+
+def test_businesses_sort_and_pagination(client):
+    response = client.get("/api/businesses", params={"sort_by": "review_count", "order": "asc",
+                                                     "limit": 2, "offset": 1})
+    assert _ids(response) == ["b", "c"]
+    assert response.json()["has_more"] is True
+    assert response.json()["total"] is None  # Counting all matches is opt-in
+
+    response = client.get("/api/businesses", params={"sort_by": "review_count", "order": "asc",
+                                                     "limit": 2, "offset": 2, "include_total": True})
+    assert _ids(response) == ["c", "a"]
+    assert response.json()["has_more"] is False
+    assert response.json()["total"] == 4
+
+
+def test_businesses_validation(client):
+    assert client.get("/api/businesses", params={"sort_by": "bogus"}).status_code == 400
+    assert client.get("/api/businesses", params={"order": "up"}).status_code == 400
+    assert client.get("/api/businesses/stats/rating", params={"group_by": "state"}).status_code == 400
+
+
+def test_businesses_count(client):
+    assert client.get("/api/businesses/count", params={"min_rating": 4}).json() == {"count": 2}
+    assert client.get("/api/businesses/count", params={"category": "bars", "city": "Chicago"}).json() == {"count": 2}
+
+
+def test_rating_stats(client):
+    by_category = client.get("/api/businesses/stats/rating", params={"group_by": "category"}).json()["groups"]
+    assert by_category == [
+        {"alias": "pizza", "title": "Pizza", "count": 3, "avg_rating": 3.17},
+        {"alias": "bars", "title": "Bars", "count": 2, "avg_rating": 3.5},
+    ]
+
+    by_city = client.get("/api/businesses/stats/rating", params={"group_by": "city"}).json()["groups"]
+    assert by_city == [
+        {"city": "Chicago", "count": 3, "avg_rating": 3.83},
+        {"city": "New York", "count": 1, "avg_rating": 3.0},
+    ]
+
+
+def test_price_stats_single_missing_price_bucket(client):
+    assert client.get("/api/businesses/stats/price").json()["prices"] == [
+        {"price": None, "count": 2},
+        {"price": "$", "count": 1},
+        {"price": "$$", "count": 1},
+    ]
+
+
+def test_search_api_serves_cached_businesses(client):
+    response = client.get("/api/search", params={"term": "Pizza", "location": "chicago", "max_results": 50})
+    assert _ids(response) == ["a", "b", "c", "d"]
+
+
+def test_export_cached_search(client):
+    response = client.get("/api/export", params={"term": "pizza", "location": "Chicago", "max_results": 2})
+    assert response.status_code == 200
+    with open(response.json()["file"], encoding="utf-8") as f:
+        assert len(f.readlines()) == 3  # Header and two businesses
+
+
+def test_export_api_uncached_search_is_400(client):
+    response = client.get("/api/export", params={"term": "sushi", "location": "Boston"})
+    assert response.status_code == 400
+
+
+def test_uncached_results_skip_inserts_without_search_term(client, monkeypatch):
+    from backend.models.db_manager import db_manager
+    from backend.services.yelp_service import cache_businesses
+
+    inserted = []
+    monkeypatch.setattr(db_manager, "insert_search_term", lambda **kwargs: None)  # e.g. the database was locked
+    monkeypatch.setattr(db_manager, "insert_business", lambda *args: inserted.append(args))
+    cache_businesses("sushi", "Boston", "best_match", 50, 50, [_business("e", [])])
+    assert inserted == []
+
+
+def test_benchmark_compare():
+    baseline = {"scenarios": {
+        "search": {"p95_ms": 100.0, "throughput": 50.0, "errors": 0},
+        "export": {"p95_ms": 100.0, "throughput": 50.0, "errors": 0},
+        "removed": {"p95_ms": 100.0, "throughput": 50.0, "errors": 0},
+    }}
+    current = {"scenarios": {
+        "search": {"p95_ms": 130.0, "throughput": 40.0, "errors": 2},
+        "export": {"p95_ms": 110.0, "throughput": 46.0, "errors": 0},  # Within the threshold
+        "added": {"p95_ms": 999.0, "throughput": 1.0, "errors": 9},
+    }}
+
+    assert compare(baseline, current, threshold=0.15) == [
+        "search.p95_ms: 100.00 -> 130.00 (+30.0%)",
+        "search.throughput: 50.00 -> 40.00 (-20.0%)",
+        "search.errors: 0 -> 2",
+    ]
+    assert compare(baseline, baseline, threshold=0.15) == []
+
+
+def test_same_day_interval():
+    assert hours_to_week_intervals(0, "0900", "2000") == [(540, 1200)]
+
+
+def test_overnight_interval_is_split_at_midnight():
+    friday = 4 * MINUTES_PER_DAY
+    assert hours_to_week_intervals(4, "1800", "0200", True) == [
+        (friday + 18 * 60, friday + MINUTES_PER_DAY),
+        (friday + MINUTES_PER_DAY, friday + MINUTES_PER_DAY + 2 * 60),
+    ]
+
+
+def test_sunday_overnight_wraps_to_monday():
+    assert hours_to_week_intervals(6, "2200", "0300", True) == [
+        (6 * MINUTES_PER_DAY + 22 * 60, MINUTES_PER_WEEK),
+        (0, 3 * 60),
+    ]
+
+
+def test_closing_at_midnight_is_not_split():
+    assert hours_to_week_intervals(2, "1700", "0000", True) == [(2 * MINUTES_PER_DAY + 17 * 60, 3 * MINUTES_PER_DAY)]
+
+
+def test_minute_of_week():
+    assert minute_of_week(datetime(2025, 2, 10, 0, 0)) == 0  # Monday
+    assert minute_of_week(datetime(2025, 2, 16, 23, 59)) == MINUTES_PER_WEEK - 1  # Sunday
+
+
+def test_open_at_multi_interval_day(manager):
+    # Open for lunch and dinner on Monday, closed in between
+    manager.insert_business(_business("split-shift", [
+        {"day": 0, "start_time": "1100", "end_time": "1400", "is_overnight": False},
+        {"day": 0, "start_time": "1700", "end_time": "2200", "is_overnight": False},
+    ]), manager.search_term)
+
+    assert manager.filter_open_business_ids(["split-shift"], 12 * 60) == {"split-shift"}
+    assert manager.filter_open_business_ids(["split-shift"], 15 * 60) == set()
+    assert manager.filter_open_business_ids(["split-shift"], 21 * 60 + 59) == {"split-shift"}
+    assert manager.filter_open_business_ids(["split-shift"], 22 * 60) == set()
+
+
+def test_open_at_overnight(manager):
+    manager.insert_business(_business("late-bar", [
+        {"day": 5, "start_time": "2000", "end_time": "0300", "is_overnight": True},
+        {"day": 6, "start_time": "2000", "end_time": "0300", "is_overnight": True},
+    ]), manager.search_term)
+    manager.insert_business(_business("day-cafe", [
+        {"day": 6, "start_time": "0800", "end_time": "1600", "is_overnight": False},
+    ]), manager.search_term)
+
+    sunday_1am = 6 * MINUTES_PER_DAY + 60
+    monday_1am = 60
+    sunday_noon = 6 * MINUTES_PER_DAY + 12 * 60
+
+    assert manager.count_businesses({"open_at": sunday_1am}) == 1
+    assert manager.filter_open_business_ids(["late-bar", "day-cafe"], sunday_1am) == {"late-bar"}
+    assert manager.filter_open_business_ids(["late-bar", "day-cafe"], monday_1am) == {"late-bar"}
+    assert manager.filter_open_business_ids(["late-bar", "day-cafe"], sunday_noon) == {"day-cafe"}
+
+
+def test_parse_open_at():
+    assert parse_open_at("2025-02-10T09:30") == 9 * 60 + 30
+    assert parse_open_at(" NOW ") == OPEN_NOW
+    with pytest.raises(ValueError):
+        parse_open_at("2025-02-10T09:30+00:00")
+
+
+def test_open_now_uses_business_timezone(manager, monkeypatch):
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            instant = datetime(2025, 2, 10, 15, 30, tzinfo=timezone.utc)  # Monday 10:30 in New York
+            return instant.astimezone(tz) if tz else instant.replace(tzinfo=None)
+
+    monkeypatch.setattr("backend.models.db_manager.datetime", FixedDatetime)
+    hours = [{"day": 0, "start_time": "0900", "end_time": "1700", "is_overnight": False}]
+    manager.insert_business(_business("ny-shop", hours, state="NY"), manager.search_term)
+    manager.insert_business(_business("la-shop", hours, city="Los Angeles", state="CA"), manager.search_term)
+
+    # 07:30 in Los Angeles, so only the New York shop is open
+    assert manager.filter_open_business_ids(["ny-shop", "la-shop"], OPEN_NOW) == {"ny-shop"}
+    assert manager.count_businesses({"open_at": OPEN_NOW}) == 1
+
+
+def test_open_at_scans_one_day_of_intervals(manager):
+    # Open around the clock on Wednesday: a single full-day interval, the longest there is
+    manager.insert_business(_business("all-day", [
+        {"day": 2, "start_time": "0000", "end_time": "0000", "is_overnight": False},
+    ]), manager.search_term)
+    wednesday = 2 * MINUTES_PER_DAY
+
+    assert manager.filter_open_business_ids(["all-day"], wednesday) == {"all-day"}
+    assert manager.filter_open_business_ids(["all-day"], wednesday + MINUTES_PER_DAY - 1) == {"all-day"}
+    assert manager.filter_open_business_ids(["all-day"], wednesday + MINUTES_PER_DAY) == set()
+
+    sql, params = manager._open_at_subquery(wednesday).sql()
+    plan = " ".join(row[3] for row in manager.db.execute_sql(f"EXPLAIN QUERY PLAN {sql}", params))
+    assert "(start_minute>? AND start_minute<?)" in plan
+
+
+def test_rebuild_open_intervals(manager):
+    manager.insert_business(_business("late-bar", [
+        {"day": 5, "start_time": "2000", "end_time": "0300", "is_overnight": True},
+    ]), manager.search_term)
+    manager.rebuild_open_intervals()
+
+    assert manager.filter_open_business_ids(["late-bar"], 6 * MINUTES_PER_DAY + 60) == {"late-bar"}
+
+
+def test_cached_search_returns_businesses(manager):
+    manager.insert_business(_business("late-bar", []), manager.search_term)
+
+    assert [b["id"] for b in manager.get_businesses_for_search("bars", "New York")] == ["late-bar"]
+    assert manager.get_businesses_for_search("sushi", "Boston") is None
+
+
+def test_cached_search_prefetches_related_rows(manager, monkeypatch):
+    hours = [{"day": 0, "start_time": "0900", "end_time": "1700", "is_overnight": False}]
+    for business_id in ("c", "a", "b"):
+        manager.insert_business(_business(business_id, hours, categories=("bars",)), manager.search_term)
+
+    queries = []
+    execute_sql = manager.db.execute_sql
+    monkeypatch.setattr(manager.db, "execute_sql", lambda *args, **kwargs: queries.append(args) or
+                        execute_sql(*args, **kwargs))
+    businesses = manager.get_businesses_for_search("bars", "New York", max_results=2)
+
+    assert [b["id"] for b in businesses] == ["c", "a"]  # Stored order, limited to max_results
+    assert businesses[0]["categories"] == ["Bars"]
+    assert businesses[0]["business_hours"] == hours
+    assert len(queries) <= 8  # Search term, businesses and one per prefetched table, not per business
+
+
+def test_export_uncached_search_is_400(manager, monkeypatch):
+    monkeypatch.setenv("YELP_API_KEY", "test")
+    from fastapi import HTTPException
+    from backend.routes.search import export_to_csv
+
+    with pytest.raises(HTTPException) as error:
+        export_to_csv(term="sushi", location="Boston", sort_by="best_match", max_results=50)
+    assert error.value.status_code == 400
+
+
+def test_snapshot_round_trip(manager):
+    manager.insert_business(_business("late-bar", [
+        {"day": 5, "start_time": "2000", "end_time": "0300", "is_overnight": True},
+    ]), manager.search_term)
+    stream = io.StringIO()
+    counts = export_snapshot(manager.db, stream)
+
+    replica = DBManager(db_path=":memory:")
+    replica.initialize()
+    stream.seek(0)
+    result = import_snapshot(replica.db, stream)
+
+    assert result["tables"] == counts
+    assert Business.get_by_id("late-bar").to_dict()["business_hours"][0]["is_overnight"] is True
+    assert BusinessOpenInterval.select().count() == 2
+    with pytest.raises(ValueError):
+        stream.seek(0)
+        import_snapshot(replica.db, stream)
+    replica.db.close()
+
+
+def test_snapshot_replace_is_atomic(manager):
+    manager.insert_business(_business("late-bar", []), manager.search_term)
+    stream = io.StringIO()
+    export_snapshot(manager.db, stream)
+    snapshot = stream.getvalue()
+
+    with pytest.raises(ValueError):
+        import_snapshot(manager.db, io.StringIO("not a snapshot\n"), replace=True)
+    with pytest.raises(ValueError):
+        import_snapshot(manager.db, io.StringIO(snapshot[:len(snapshot) // 2]), replace=True)
+    assert Business.select().count() == 1
+
+    # A snapshot that repeats a unique value fails on the unique index instead of loading duplicates
+    header, *lines = snapshot.splitlines(keepends=True)
+    duplicated = header + "".join(line.replace('"end": "business", "rows": 1', '"end": "business", "rows": 2')
+                                  for line in lines)
+    row = next(line for line in lines if line.startswith('["late-bar"'))
+    duplicated = duplicated.replace(row, row + row.replace('["late-bar"', '["late-bar-2"', 1), 1)
+    with pytest.raises(sqlite3.IntegrityError):
+        import_snapshot(manager.db, io.StringIO(duplicated), replace=True)
+    assert Business.select().count() == 1
+    assert manager.db.get_indexes("business")
+
+    result = import_snapshot(manager.db, io.StringIO(snapshot), replace=True)
+    assert result["tables"]["business"] == 1
+    assert manager.db.execute_sql("PRAGMA synchronous").fetchone()[0] == 2
+
+
+def test_normalize_text():
+    assert normalize_text("  Pizza ") == "pizza"
+    assert normalize_text("Café\u00a0Crème") == "cafe creme"
+    assert normalize_text("New York, NY") == "new york ny"
+
+
+def test_normalize_location_drops_state_and_country():
+    assert normalize_location("Austin, TX, USA") == "austin"
+    assert normalize_location("austin tx") == "austin"
+    assert normalize_location("Baton Rouge, LA") == "baton rouge"
+    assert normalize_location("LA") == "la"  # A bare state code is not a city
+    assert normalize_location("Washington, DC") == "washington dc"
+
+
+def test_search_variants_share_cache_entry(manager):
+    assert manager.is_search_cached("Bars ", "new york, ny", "best_match", 50, 50)
+    assert manager.is_search_cached("BARS", "NYC", max_results=20)
+    assert not manager.is_search_cached("bars", "New York", max_results=100)
+    assert not manager.is_search_cached("bars", "New York", sort_by="rating")
+
+    assert manager.insert_search_term("bars", "nyc", "best_match", 50, 100).id == manager.search_term.id
+    assert manager.is_search_cached("bars", "New York", max_results=100)
+
+
+def test_canonicalize_merges_duplicate_search_terms(manager, monkeypatch):
+    manager.insert_business(_business("late-bar", []), manager.search_term)
+    manager.insert_business(_business("day-cafe", []), manager.search_term)
+    duplicate = SearchTerm.create(term="bars", location="New York City", max_results=100)
+    BusinessSearch.create(search_term=duplicate, business="late-bar")
+    BusinessSearch.create(search_term=SearchTerm.create(term="pizza", location="NYC"), business="day-cafe")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(BusinessSearch, "delete", classmethod(lambda cls: 1 / 0))
+        assert manager.canonicalize_search_terms() == 0
+    assert SearchTerm.select().count() == 3
+
+    assert manager.canonicalize_search_terms() == 1
+    assert SearchTerm.select().count() == 2
+
+    keeper = SearchTerm.get_by_id(manager.search_term.id)
+    assert keeper.canonical_key == "bars|new york|best match"
+    assert keeper.max_results == 100
+    assert sorted(bs.business_id for bs in keeper.businesses) == ["day-cafe", "late-bar"]
+
+
+def test_replay_resolves_locations_through_alias_table(manager):
+    log = [
+        {"term": "Bars", "location": "New York", "max_results": 100},
+        {"term": "bars ", "location": "new york, ny", "max_results": 100},
+        {"term": "bars", "location": "Big Apple", "max_results": 50},
+    ]
+    assert replay(log)["normalized_hit_rate"] == pytest.approx(1 / 3)
+
+    manager.add_location_alias("Big Apple", "New York")
+    result = replay(log)
+    assert result["raw_hit_rate"] == 0
+    assert result["normalized_hit_rate"] == pytest.approx(1 / 3)
+    assert result["canonical_hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_replay_log_avoids_seeded_aliases():
+    seeded = set(DEFAULT_LOCATION_ALIASES) | set(DEFAULT_LOCATION_ALIASES.values())
+    assert not {normalize_location(query["location"]) for query in generate_log(2000)} & seeded
+
+
+def test_migrates_search_terms_without_canonical_key(tmp_path):
+    db_path = str(tmp_path / "old.db")
+    old = SqliteDatabase(db_path)
+    old.execute_sql(
+        'CREATE TABLE "searchterm" ("id" INTEGER NOT NULL PRIMARY KEY, "term" VARCHAR(255) NOT NULL, '
+        '"location" VARCHAR(255) NOT NULL, "sort_by" VARCHAR(255) NOT NULL, "limit" INTEGER NOT NULL, '
+        '"max_results" INTEGER NOT NULL, "created_at" DATETIME NOT NULL)'
+    )
+    old.execute_sql(
+        'CREATE UNIQUE INDEX "searchterm_term_location_sort_by_limit_max_results" '
+        'ON "searchterm" ("term", "location", "sort_by", "limit", "max_results")'
+    )
+    for term, location in (("Pizza", "New York"), ("pizza ", "new york, ny"), ("gyms", "Los Angeles, CA, USA")):
+        old.execute_sql(
+            'INSERT INTO "searchterm" ("term", "location", "sort_by", "limit", "max_results", "created_at") '
+            "VALUES (?, ?, 'best_match', 10, 50, '2025-01-01 00:00:00')", (term, location)
+        )
+    old.close()
+
+    manager = DBManager(db_path=db_path)
+    manager.initialize()
+    try:
+        assert sorted(t.canonical_key for t in SearchTerm.select()) == [
+            "gyms|los angeles|best match", "pizza|new york|best match"
+        ]
+        assert manager.is_search_cached("PIZZA", "NYC")
+    finally:
+        manager.db.close()
+        database_proxy.initialize(None)
+
+
+def test_initialize_retires_aliases_and_rekeys_searches(tmp_path):
+    db_path = str(tmp_path / "aliases.db")
+    manager = DBManager(db_path=db_path)
+    manager.initialize()
+    LocationAlias.insert_many([
+        {"alias": "la", "canonical": "los angeles"},
+        {"alias": "dallas tx", "canonical": "dallas"},
+        {"alias": "big apple", "canonical": "new york"},
+    ]).execute()
+    SearchTerm.create(term="bars", location="LA", canonical_key="bars|los angeles|best match")
+    SearchTerm.create(term="bars", location="Big Apple, NY", canonical_key="bars|big apple ny|best match")
+    manager.db.close()
+
+    manager.initialize()
+    try:
+        assert sorted(a.alias for a in LocationAlias.select() if a.canonical != "washington dc") == [
+            "big apple", "new york city", "new york new york", "nyc", "philly", "sf"
+        ]
+        assert sorted(t.canonical_key for t in SearchTerm.select()) == [
+            "bars|la|best match", "bars|new york|best match"
+        ]
+        assert not manager.canonical_keys_outdated()
+    finally:
+        manager.db.close()
+        database_proxy.initialize(None)